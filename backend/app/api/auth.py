@@ -1,15 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Body, status, Header
+from fastapi import APIRouter, Depends, HTTPException, Body, status, Header, Query
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from pydantic import BaseModel, EmailStr
 from starlette.status import HTTP_201_CREATED, HTTP_401_UNAUTHORIZED
-from app.db.api_key_manager import ApiKeyManager
+from app.db.api_key_manager import ApiKeyManager, USAGE_GRANULARITIES
+from app.models.api_key import hash_api_key
 from app.models.user import UserCreate, UserLogin, UserResponse
-from app.db.mongodb import MongoDB
-from jose import jwt, JWTError
-from datetime import datetime, timedelta
+from app.db.mongodb import MongoDB, as_utc
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 import secrets
 import os
 
+# python-jose is imported inside the token helpers so it only loads once auth is used
 router = APIRouter()
 security = HTTPBasic()
 
@@ -19,6 +21,13 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
+# Default report window per usage granularity
+USAGE_REPORT_WINDOWS = {
+    "minute": timedelta(hours=1),
+    "hour": timedelta(days=2),
+    "day": timedelta(days=30)
+}
+
 class KeyRequest(BaseModel):
     user_email: EmailStr
     user_name: str
@@ -29,6 +38,7 @@ class KeyResponse(BaseModel):
     message: str
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
+    from jose import jwt
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
@@ -38,6 +48,7 @@ def get_current_user(authorization: str = Header(...)):
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header.")
     token = authorization.split(" ", 1)[1]
+    from jose import jwt, JWTError
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("sub")
@@ -84,16 +95,17 @@ def read_users_me(current_user_email: str = Depends(get_current_user)):
 @router.post("/register", response_model=KeyResponse, status_code=HTTP_201_CREATED, include_in_schema=True)
 def register_key(request: KeyRequest):
     """
-    Register and get a free API key (one per email, free tier)
+    Register and get a free API key (one per email, free tier).
+    The key is only shown in this response.
     """
     api_key_manager = ApiKeyManager()
-    # Check if user already has a key
+    # Check if user already has a key; it is stored hashed, so it cannot be shown again
     existing_keys = api_key_manager.get_user_keys(request.user_email)
     if existing_keys:
-        return {
-            "key": existing_keys[0].key,
-            "message": f"API key already exists for {request.user_email}."
-        }
+        raise HTTPException(
+            status_code=409,
+            detail=f"API key already exists for {request.user_email}. Regenerate it from the dashboard if it was lost."
+        )
     key = api_key_manager.create_api_key(
         user_email=request.user_email,
         user_name=request.user_name,
@@ -126,7 +138,7 @@ def get_user_keys(email: str, credentials: HTTPBasicCredentials = Depends(securi
         "email": email,
         "keys": [
             {
-                "key": key.key,
+                "key_prefix": key.key_prefix,
                 "tier": key.tier,
                 "is_active": key.is_active,
                 "created_at": key.created_at,
@@ -153,7 +165,7 @@ def get_user_api_keys(current_user: str = Depends(get_current_user)):
         "email": current_user,
         "keys": [
             {
-                "key": key.key,
+                "key_prefix": key.key_prefix,
                 "tier": key.tier,
                 "is_active": key.is_active,
                 "created_at": key.created_at,
@@ -164,22 +176,62 @@ def get_user_api_keys(current_user: str = Depends(get_current_user)):
         ]
     }
 
+@router.get("/user/api-keys/usage")
+def get_user_api_key_usage(
+    granularity: str = Query("day"),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Get per-minute, per-hour or per-day request counts for the current user's keys.
+    """
+    if granularity not in USAGE_GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of: {', '.join(USAGE_GRANULARITIES)}")
+    end = as_utc(end) if end else datetime.now(timezone.utc)
+    start = as_utc(start) if start else end - USAGE_REPORT_WINDOWS[granularity]
+    api_key_manager = ApiKeyManager()
+    keys = api_key_manager.get_user_keys(current_user)
+    report = api_key_manager.get_usage_report([key.key_hash for key in keys], granularity, start, end)
+    return {
+        "email": current_user,
+        "granularity": granularity,
+        "from": start,
+        "to": end,
+        "keys": [
+            {
+                "key_prefix": key.key_prefix,
+                "tier": key.tier,
+                "total_requests": key.total_requests,
+                "usage": report[key.key_hash]
+            }
+            for key in keys
+        ]
+    }
+
 @router.post("/user/api-keys/regenerate")
 def regenerate_api_key(current_user: str = Depends(get_current_user)):
     api_key_manager = ApiKeyManager()
     # Deactivate all old keys for this user
     for key in api_key_manager.get_user_keys(current_user):
-        api_key_manager.deactivate_api_key(key.key)
+        if key.is_active:
+            api_key_manager.deactivate_key_hash(key.key_hash)
     # Create a new key
     new_key = api_key_manager.create_api_key(user_email=current_user, user_name=current_user, tier="free")
     return {"key": new_key, "message": "API key regenerated successfully."}
 
 @router.post("/user/api-keys/revoke")
 def revoke_api_key(key: str, current_user: str = Depends(get_current_user)):
+    """
+    Revoke one of the current user's keys, given the full key or its prefix.
+    """
     api_key_manager = ApiKeyManager()
     # Only allow revoking keys belonging to the current user
-    user_keys = [k.key for k in api_key_manager.get_user_keys(current_user)]
-    if key not in user_keys:
+    key_hash = hash_api_key(key)
+    matches = [k for k in api_key_manager.get_user_keys(current_user) if k.key_hash == key_hash or k.key_prefix == key]
+    if not matches:
         raise HTTPException(status_code=403, detail="You can only revoke your own API keys.")
-    api_key_manager.deactivate_api_key(key)
+    if len(matches) > 1:
+        raise HTTPException(status_code=400, detail="Several of your keys share this prefix. Pass the full key.")
+    api_key_manager.deactivate_key_hash(matches[0].key_hash)
     return {"message": "API key revoked successfully."}
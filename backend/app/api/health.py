@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from pymongo.errors import PyMongoError
+from app.db.mongodb import MongoDB
+from app.db.memory_store import MemoryStore
+from app.utils.key_filter import ApiKeyFilter
+from app.utils.generation import GenerationTracker
+from app.utils.scrape_metrics import ScrapeMetrics
+
+router = APIRouter()
+
+@router.get("/health/live")
+async def liveness():
+    """
+    The process is up and serving requests
+    """
+    return {"status": "alive"}
+
+@router.get("/health/ready")
+def readiness(request: Request):
+    """
+    The worker can answer news requests: Mongo is reachable and a scrape has been published
+    """
+    checks = {"startup": request.app.state.startup_status}
+    try:
+        MongoDB().ping()
+        checks["database"] = "ok"
+    except PyMongoError as e:
+        checks["database"] = f"unreachable: {e.__class__.__name__}"
+    generation = GenerationTracker().current()["generation"]
+    checks["data"] = "ok" if generation else "no scrape published yet"
+
+    memory = MemoryStore().current
+    ready = checks["database"] == "ok" and checks["data"] == "ok"
+    return JSONResponse(
+        {
+            "status": "ready" if ready else "not ready",
+            "generation": generation,
+            "checks": checks,
+            "memory_store": memory.stats() if memory else None,
+            "key_filter": ApiKeyFilter().stats()
+        },
+        status_code=200 if ready else 503
+    )
+
+@router.get("/health/scraper")
+async def scraper_status():
+    """
+    Scrape schedule, upstream request volume and achieved freshness for this worker
+    """
+    return ScrapeMetrics().report()
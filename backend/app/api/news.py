@@ -1,107 +1,351 @@
-from fastapi import APIRouter, Query, HTTPException, Depends, Request
-from typing import List, Dict, Any, Optional
-from app.db.mongodb import MongoDB
+from fastapi import APIRouter, Query, HTTPException, Depends, Request, Response
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional, Literal
+from datetime import datetime, timezone
+from pymongo.errors import PyMongoError
+from app.db.mongodb import MongoDB, as_utc
+from app.db.snapshot import SnapshotStore
+from app.db.memory_store import MemoryStore
 from bson import ObjectId
-from app.utils.auth_middleware import rate_limit_middleware
+from bson.errors import InvalidId
+from app.utils.auth_middleware import rate_limit_middleware, batch_rate_limit_middleware
+from app.utils.http_cache import conditional_news_request
+from app.utils.response_cache import ResponseCache, CompressedPayload
+from app.utils.serialization import encode_json
+from app.utils.fieldsets import Fieldset, DEFAULT_PROJECTION, news_fieldset, parse_fieldset
+from app.utils.query_shapes import FILTER_FIELDS, parse_sort
+from app.utils.outage import database_down, report_database_failure
+import asyncio
+import base64
 import json
 
 router = APIRouter()
-db = MongoDB()
 
-class JSONEncoder(json.JSONEncoder):
-    def default(self, o):
-        if isinstance(o, ObjectId):
-            return str(o)
-        return json.JSONEncoder.default(self, o)
+def encode_news(news: List[Dict[str, Any]]) -> bytes:
+    return encode_json({"count": len(news), "data": news})
 
-@router.get("/news", dependencies=[Depends(rate_limit_middleware)])
+def json_response(request: Request, news: List[Dict[str, Any]]) -> Response:
+    """Response for a cold query; GZipMiddleware compresses it above GZIP_MINIMUM_SIZE."""
+    headers = getattr(request.state, "cache_headers", {})
+    return Response(encode_news(news), media_type="application/json", headers=headers)
+
+def projection(fieldset: Optional[Fieldset]) -> Dict[str, Any]:
+    return fieldset.projection() if fieldset else DEFAULT_PROJECTION
+
+def cached_response(request: Request, limit: int, fetch, fieldset: Optional[Fieldset] = None) -> Response:
+    """Serve a hot first page from payloads compressed once per scrape generation."""
+    cache = ResponseCache()
+    generation = request.state.generation
+    key = (request.url.path, limit, fieldset.key if fieldset else None)
+    payload = cache.get(generation, key)
+    if payload is None:
+        payload = CompressedPayload(encode_news(fetch()))
+        cache.put(generation, key, payload)
+    return payload.response(request.headers.get("accept-encoding", ""), request.state.cache_headers)
+
+def load_news(request: Request, fetch, limit: int, skip: int = 0, ascending: bool = False,
+              fieldset: Optional[Fieldset] = None, **filters) -> List[Dict[str, Any]]:
+    """Answer from the in-memory hot window when it covers the query, otherwise run `fetch` against Mongo."""
+    view = MemoryStore().view(getattr(request.state, "generation", None))
+    if view is not None and not (fieldset and fieldset.heavy):
+        news = view.query(limit, skip=skip, ascending=ascending, **filters)
+        if news is not None:
+            return [fieldset.apply(article) for article in news] if fieldset else news
+    return fetch()
+
+async def with_snapshot_fallback(serve, fallback):
+    """
+    Answer from Mongo, or from the local snapshot while the database is down.
+    `serve` runs in the threadpool so a stalled database never blocks the event loop.
+    """
+    if database_down():
+        return fallback()
+    try:
+        return await run_in_threadpool(serve)
+    except PyMongoError:
+        report_database_failure()
+        return fallback()
+
+def current_snapshot():
+    snapshot = SnapshotStore().current()
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="News database is unavailable.", headers={"Retry-After": "30"})
+    return snapshot
+
+def stale_headers(snapshot) -> Dict[str, str]:
+    age = max(0, int((datetime.now(timezone.utc) - snapshot.published_at).total_seconds()))
+    return {
+        "X-Data-Stale": "true",
+        "X-Snapshot-Generation": str(snapshot.generation),
+        "Age": str(age),
+        "Cache-Control": "no-store"
+    }
+
+def stale_response(limit: int, skip: int = 0, ascending: bool = False, fieldset: Optional[Fieldset] = None, **filters) -> Response:
+    """Read-only answer from the last published snapshot, marked as stale."""
+    if fieldset and fieldset.heavy:
+        query_unavailable()
+    snapshot = current_snapshot()
+    bodies = snapshot.query(skip=skip, limit=limit, ascending=ascending, **filters)
+    if fieldset:
+        body = encode_news([fieldset.apply(json.loads(article)) for article in bodies])
+    else:
+        body = b'{"count":%d,"data":[%s]}' % (len(bodies), b",".join(bodies))
+    return Response(body, media_type="application/json", headers=stale_headers(snapshot))
+
+def query_unavailable():
+    """Searches and article bodies cannot be answered from the snapshot."""
+    raise HTTPException(status_code=503, detail="This query is unavailable while the news database is down.", headers={"Retry-After": "30"})
+
+class BatchQuery(BaseModel):
+    type: Literal["latest", "category", "source", "search"]
+    value: Optional[str] = None  # category, source or search text
+    limit: int = Field(20, ge=1)
+    cursor: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    queries: List[BatchQuery]
+    fields: Optional[str] = None  # comma-separated, applies to every sub-query
+    view: Literal["full", "summary"] = "full"
+
+def encode_cursor(article: Dict[str, Any]) -> str:
+    """Opaque cursor pointing just past `article` in newest-first order."""
+    raw = f"{article['published_at'].isoformat()}|{article['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        published_at, last_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return as_utc(datetime.fromisoformat(published_at)), ObjectId(last_id)
+    except (ValueError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+def validate_time_range(start: Optional[datetime], end: Optional[datetime]):
+    """Reject inverted from/to ranges."""
+    if start and end and as_utc(start) > as_utc(end):
+        raise HTTPException(status_code=400, detail="'from' must not be later than 'to'.")
+
+@router.get("/news", dependencies=[Depends(conditional_news_request), Depends(rate_limit_middleware)])
 async def get_news(
     request: Request,
     limit: int = Query(20, ge=1),
     skip: int = Query(0, ge=0),
-    sort_by: str = Query("timestamp_iso"),
-    sort_order: int = Query(-1)  # -1 for descending, 1 for ascending
+    sort_by: str = Query("published_at"),  # one of SORT_FIELDS
+    sort_order: int = Query(-1),  # -1 for descending, 1 for ascending
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    fieldset: Optional[Fieldset] = Depends(news_fieldset)
 ):
     """
     Get all news with pagination
     """
+    db = MongoDB()
     # Apply tier-based limits
     max_results = request.state.max_results
     if limit > max_results:
         limit = max_results
     
-    news = db.get_all_news(limit=limit, skip=skip, sort_by=sort_by, sort_order=sort_order)
-    return {"count": len(news), "data": json.loads(JSONEncoder().encode(news))}
+    validate_time_range(start, end)
+    # Only indexed sorts are accepted, and they all order by published_at
+    parse_sort(sort_by, sort_order)
+    fetch = lambda: db.get_all_news(
+        limit=limit, skip=skip, sort_by=sort_by, sort_order=sort_order, start=start, end=end, projection=projection(fieldset)
+    )
+    return await with_snapshot_fallback(
+        lambda: json_response(request, load_news(request, fetch, limit, skip, sort_order == 1, fieldset, start=start, end=end)),
+        lambda: stale_response(limit, skip, sort_order == 1, fieldset, start=start, end=end)
+    )
 
-@router.get("/news/category/{category}", dependencies=[Depends(rate_limit_middleware)])
+@router.get("/news/category/{category}", dependencies=[Depends(conditional_news_request), Depends(rate_limit_middleware)])
 async def get_news_by_category(
     request: Request,
     category: str,
     limit: int = Query(20, ge=1),
-    skip: int = Query(0, ge=0)
+    skip: int = Query(0, ge=0),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    fieldset: Optional[Fieldset] = Depends(news_fieldset)
 ):
     """
     Get news by category
     """
+    db = MongoDB()
     # Apply tier-based limits
     max_results = request.state.max_results
     if limit > max_results:
         limit = max_results
         
-    news = db.get_news_by_category(category=category, limit=limit, skip=skip)
-    if not news:
-        return {"count": 0, "data": []}
-    return {"count": len(news), "data": json.loads(JSONEncoder().encode(news))}
+    validate_time_range(start, end)
+    def serve():
+        fetch = lambda: load_news(
+            request, lambda: db.get_news_by_category(
+                category=category, limit=limit, skip=skip, start=start, end=end, projection=projection(fieldset)
+            ),
+            limit, skip, fieldset=fieldset, category=category, start=start, end=end
+        )
+        if skip == 0 and start is None and end is None:
+            return cached_response(request, limit, fetch, fieldset)
+        return json_response(request, fetch())
+    return await with_snapshot_fallback(serve, lambda: stale_response(limit, skip, fieldset=fieldset, category=category, start=start, end=end))
 
-@router.get("/news/search", dependencies=[Depends(rate_limit_middleware)])
+@router.get("/news/search", dependencies=[Depends(conditional_news_request), Depends(rate_limit_middleware)])
 async def search_news(
     request: Request,
     query: str,
     limit: int = Query(20, ge=1),
-    skip: int = Query(0, ge=0)
+    skip: int = Query(0, ge=0),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    fieldset: Optional[Fieldset] = Depends(news_fieldset)
 ):
     """
     Search news by query
     """
+    db = MongoDB()
     # Apply tier-based limits
     max_results = request.state.max_results
     if limit > max_results:
         limit = max_results
         
-    news = db.search_news(query=query, limit=limit, skip=skip)
-    return {"count": len(news), "data": json.loads(JSONEncoder().encode(news))}
+    validate_time_range(start, end)
+    return await with_snapshot_fallback(
+        lambda: json_response(request, db.search_news(
+            query=query, limit=limit, skip=skip, start=start, end=end, projection=projection(fieldset)
+        )),
+        query_unavailable
+    )
 
-@router.get("/news/latest", dependencies=[Depends(rate_limit_middleware)])
+@router.get("/news/latest", dependencies=[Depends(conditional_news_request), Depends(rate_limit_middleware)])
 async def get_latest_news(
     request: Request,
-    limit: int = Query(10, ge=1)
+    limit: int = Query(10, ge=1),
+    fieldset: Optional[Fieldset] = Depends(news_fieldset)
 ):
     """
     Get the latest news
     """
+    db = MongoDB()
     # Apply tier-based limits
     max_results = request.state.max_results
     if limit > max_results:
         limit = max_results
         
-    news = db.get_all_news(limit=limit, sort_by="timestamp_iso", sort_order=-1)
-    return {"count": len(news), "data": json.loads(JSONEncoder().encode(news))}
+    return await with_snapshot_fallback(
+        lambda: cached_response(request, limit, lambda: load_news(
+            request, lambda: db.get_all_news(limit=limit, sort_by="published_at", sort_order=-1, projection=projection(fieldset)),
+            limit, fieldset=fieldset
+        ), fieldset),
+        lambda: stale_response(limit, fieldset=fieldset)
+    )
 
-@router.get("/news/source/{source}", dependencies=[Depends(rate_limit_middleware)])
+@router.get("/news/source/{source}", dependencies=[Depends(conditional_news_request), Depends(rate_limit_middleware)])
 async def get_news_by_source(
     request: Request,
     source: str,
     limit: int = Query(20, ge=1),
-    skip: int = Query(0, ge=0)
+    skip: int = Query(0, ge=0),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    fieldset: Optional[Fieldset] = Depends(news_fieldset)
 ):
     """
     Get news by source (e.g., Economic Times, Bloomberg Quint)
     """
+    db = MongoDB()
     # Apply tier-based limits
     max_results = request.state.max_results
     if limit > max_results:
         limit = max_results
         
-    cursor = db.collection.find({"source": source}).sort("timestamp_iso", -1).skip(skip).limit(limit)
-    news = list(cursor)
-    return {"count": len(news), "data": json.loads(JSONEncoder().encode(news))}
+    validate_time_range(start, end)
+    def serve():
+        fetch = lambda: load_news(
+            request, lambda: db.get_news_by_source(
+                source=source, limit=limit, skip=skip, start=start, end=end, projection=projection(fieldset)
+            ),
+            limit, skip, fieldset=fieldset, source=source, start=start, end=end
+        )
+        if skip == 0 and start is None and end is None:
+            return cached_response(request, limit, fetch, fieldset)
+        return json_response(request, fetch())
+    return await with_snapshot_fallback(serve, lambda: stale_response(limit, skip, fieldset=fieldset, source=source, start=start, end=end))
+
+@router.post("/news/batch", dependencies=[Depends(batch_rate_limit_middleware)])
+async def get_news_batch(request: Request, batch: BatchRequest):
+    """
+    Run several news queries in one request (latest, category, source, search)
+    """
+    db = MongoDB()
+    max_queries = request.state.max_batch_queries
+    if not batch.queries:
+        raise HTTPException(status_code=400, detail="At least one query is required.")
+    if len(batch.queries) > max_queries:
+        raise HTTPException(status_code=400, detail=f"Maximum {max_queries} queries per batch for your tier.")
+
+    fieldset = parse_fieldset(batch.fields, batch.view)
+    # Cursors are built from published_at and _id, so always fetch them
+    batch_projection = fieldset.including("_id", "published_at").projection() if fieldset else DEFAULT_PROJECTION
+    plans = []
+    for sub_query in batch.queries:
+        if sub_query.type != "latest" and not sub_query.value:
+            raise HTTPException(status_code=400, detail=f"'{sub_query.type}' queries require a value.")
+        if sub_query.type == "latest":
+            query = {}
+        elif sub_query.type == "search":
+            query = {"$text": {"$search": sub_query.value}}
+        else:
+            query = {FILTER_FIELDS[sub_query.type]: sub_query.value}
+        # Apply tier-based limits to every sub-query
+        limit = min(sub_query.limit, request.state.max_results)
+        after = decode_cursor(sub_query.cursor) if sub_query.cursor else None
+        plans.append((query, limit, after))
+
+    pages = None
+    if not database_down():
+        try:
+            # Sub-queries are independent indexed lookups, so run them side by side
+            pages = await asyncio.gather(*(
+                run_in_threadpool(db.get_news_page, query, limit, after, batch_projection) for query, limit, after in plans
+            ))
+        except PyMongoError:
+            report_database_failure()
+    if pages is None:
+        return stale_batch_response(batch.queries, plans, fieldset)
+
+    results = []
+    for sub_query, (_, limit, _), news in zip(batch.queries, plans, pages):
+        results.append({
+            "type": sub_query.type,
+            "value": sub_query.value,
+            "count": len(news),
+            "next_cursor": encode_cursor(news[-1]) if len(news) == limit else None,
+            "data": [fieldset.apply(article) for article in news] if fieldset else news
+        })
+    return Response(encode_json({"count": len(results), "results": results}), media_type="application/json")
+
+def stale_batch_response(queries: List[BatchQuery], plans, fieldset: Optional[Fieldset] = None) -> Response:
+    """Answer a batch from the snapshot; only first pages of latest, category and source are available."""
+    if fieldset and fieldset.heavy:
+        query_unavailable()
+    snapshot = current_snapshot()
+    results = []
+    for sub_query, (_, limit, after) in zip(queries, plans):
+        if sub_query.type == "search" or after is not None:
+            query_unavailable()
+        filters = {sub_query.type: sub_query.value} if sub_query.type != "latest" else {}
+        news = [json.loads(body) for body in snapshot.query(limit=limit, **filters)]
+        if fieldset:
+            news = [fieldset.apply(article) for article in news]
+        results.append({
+            "type": sub_query.type,
+            "value": sub_query.value,
+            "count": len(news),
+            "next_cursor": None,
+            "data": news
+        })
+    return Response(
+        encode_json({"count": len(results), "results": results}),
+        media_type="application/json",
+        headers=stale_headers(snapshot)
+    )
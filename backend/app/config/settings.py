@@ -8,20 +8,88 @@ load_dotenv()
 MONGODB_URI = os.getenv("MONGODB_URI")
 DB_NAME = os.getenv("DB_NAME", "finance_news")
 COLLECTION_NAME = os.getenv("COLLECTION_NAME", "news_articles")
+MONGODB_TIMEOUT_MS = int(os.getenv("MONGODB_TIMEOUT_MS", 5000))  # server selection timeout
+RUN_MIGRATIONS_ON_STARTUP = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "true").lower() == "true"  # else use run_migrations.py
 
 # Scraping Configuration
-SCRAPE_INTERVAL = int(os.getenv("SCRAPE_INTERVAL", 60))  # in seconds
+SCRAPE_INTERVAL = int(os.getenv("SCRAPE_INTERVAL", 60))  # in seconds, starting point for adaptive scheduling
+SCRAPE_MIN_INTERVAL = int(os.getenv("SCRAPE_MIN_INTERVAL", 30))  # fastest polling while new articles keep arriving
+SCRAPE_MAX_INTERVAL = int(os.getenv("SCRAPE_MAX_INTERVAL", 600))  # slowest polling while the feed is unchanged
+SCRAPE_MAX_BACKOFF = int(os.getenv("SCRAPE_MAX_BACKOFF", 3600))  # longest wait after repeated failures
+SCRAPE_JITTER = float(os.getenv("SCRAPE_JITTER", 0.1))  # +/- fraction applied to every delay
+SCRAPE_CLOSED_INTERVAL = int(os.getenv("SCRAPE_CLOSED_INTERVAL", 1800))  # polling outside trading hours
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 100))  # items buffered between scrape pipeline stages
+STORE_BATCH_SIZE = int(os.getenv("STORE_BATCH_SIZE", 50))  # articles per archive write
+
+# Trading Hours Configuration (empty TRADING_HOURS polls the same way around the clock)
+TRADING_HOURS = os.getenv("TRADING_HOURS", "")  # e.g. "09:15-15:30"
+TRADING_DAYS = os.getenv("TRADING_DAYS", "mon,tue,wed,thu,fri")
+TRADING_HOLIDAYS = os.getenv("TRADING_HOLIDAYS", "")  # comma-separated YYYY-MM-DD dates
 
 # News Feed URL (generic, not mentioning Zerodha)
 NEWS_FEED_URL = os.getenv("NEWS_FEED_URL")
 NEWS_FEED_USER_AGENT = os.getenv("NEWS_FEED_USER_AGENT", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+NEWS_FEED_MAX_BYTES = int(os.getenv("NEWS_FEED_MAX_BYTES", 10_000_000))  # larger feed pages are cut off
+
+# Enrichment Configuration (fetches linked article pages after each published scrape)
+ENRICHMENT_ENABLED = os.getenv("ENRICHMENT_ENABLED", "false").lower() == "true"
+ENRICHMENT_CONCURRENCY = int(os.getenv("ENRICHMENT_CONCURRENCY", 16))  # pooled connections across all sites
+ENRICHMENT_PER_DOMAIN = int(os.getenv("ENRICHMENT_PER_DOMAIN", 2))  # concurrent fetches per site
+ENRICHMENT_TIMEOUT = float(os.getenv("ENRICHMENT_TIMEOUT", 10))  # seconds per page
+ENRICHMENT_BUDGET = float(os.getenv("ENRICHMENT_BUDGET", 60))  # seconds per pass; unfinished articles wait for the next one
+ENRICHMENT_BATCH_SIZE = int(os.getenv("ENRICHMENT_BATCH_SIZE", 200))  # articles per pass
+ENRICHMENT_MAX_PAGE_BYTES = int(os.getenv("ENRICHMENT_MAX_PAGE_BYTES", 2_000_000))
+ENRICHMENT_MAX_BODY_CHARS = int(os.getenv("ENRICHMENT_MAX_BODY_CHARS", 20000))
+ENRICHMENT_RETRY_SECONDS = int(os.getenv("ENRICHMENT_RETRY_SECONDS", 900))  # wait after a transient failure, times the attempts so far
+ENRICHMENT_MAX_ATTEMPTS = int(os.getenv("ENRICHMENT_MAX_ATTEMPTS", 5))  # transient failures before a page is given up on
+
+# Archive Configuration
+NEWS_FEED_TIMEZONE = os.getenv("NEWS_FEED_TIMEZONE", "Asia/Kolkata")  # timezone of absolute feed timestamps and trading hours
+# TTL deletions do not bump the scrape generation, so ETags, the response cache and the
+# memory store keep showing expired articles until the next published scrape
+NEWS_RETENTION_DAYS = int(os.getenv("NEWS_RETENTION_DAYS", 0))  # 0 keeps the archive forever
 
 # API Configuration
 API_PREFIX = "/api/v1"
+BATCH_REQUEST_COST = int(os.getenv("BATCH_REQUEST_COST", 1))  # rate-limit charge for one /news/batch call
+SUMMARY_CONTENT_LENGTH = int(os.getenv("SUMMARY_CONTENT_LENGTH", 160))  # characters of content kept by view=summary
+
+# Snapshot Configuration
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "data/news_snapshot.bin")  # empty disables snapshots
+SNAPSHOT_MAX_ARTICLES = int(os.getenv("SNAPSHOT_MAX_ARTICLES", 10000))  # newest articles written per generation
+OUTAGE_KEY_GRACE_SECONDS = int(os.getenv("OUTAGE_KEY_GRACE_SECONDS", 3600))  # how long validated keys work while Mongo is down
+OUTAGE_RETRY_SECONDS = int(os.getenv("OUTAGE_RETRY_SECONDS", 10))  # serve the snapshot this long before retrying Mongo
+
+# Memory Store Configuration
+MEMORY_STORE_MAX_ARTICLES = int(os.getenv("MEMORY_STORE_MAX_ARTICLES", 5000))  # newest articles served from memory; 0 disables
+
+# HTTP Caching Configuration
+GENERATION_POLL_INTERVAL = float(os.getenv("GENERATION_POLL_INTERVAL", 5))  # seconds between scrape generation checks
+NEWS_CACHE_MAX_AGE = int(os.getenv("NEWS_CACHE_MAX_AGE", 0))  # Cache-Control max-age for news responses
+COUNT_NOT_MODIFIED_REQUESTS = os.getenv("COUNT_NOT_MODIFIED_REQUESTS", "false").lower() == "true"  # charge 304s to the quota
+
+# Compression Configuration
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 256))  # precompressed hot pages kept per worker
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", 1024))  # bytes before cold responses are gzipped
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 9))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 9))  # 10-11 compress ~10x slower for ~8% smaller bodies
+
+# Usage Tracking Configuration
+USAGE_MINUTE_RETENTION_HOURS = int(os.getenv("USAGE_MINUTE_RETENTION_HOURS", 48))  # per-minute buckets
+USAGE_HOUR_RETENTION_DAYS = int(os.getenv("USAGE_HOUR_RETENTION_DAYS", 90))  # per-hour buckets
+USAGE_DAY_RETENTION_DAYS = int(os.getenv("USAGE_DAY_RETENTION_DAYS", 0))  # per-day buckets, 0 keeps them forever
 
 # API Authentication Configuration
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "change_this_password_immediately")
+API_KEY_HASH_SECRET = os.getenv("API_KEY_HASH_SECRET", "change_this_secret_immediately")  # HMAC key for stored API keys; changing it invalidates every key
+API_KEY_PREFIX_LENGTH = 8  # leading characters of a key kept in clear so owners can tell keys apart
+
+# API Key Filter Configuration (per-worker Bloom filter of valid key hashes)
+KEY_FILTER_CAPACITY = int(os.getenv("KEY_FILTER_CAPACITY", 1_000_000))  # keys before the filter is resized
+KEY_FILTER_ERROR_RATE = float(os.getenv("KEY_FILTER_ERROR_RATE", 0.001))  # share of unknown keys still sent to Mongo
+KEY_FILTER_REFRESH_SECONDS = int(os.getenv("KEY_FILTER_REFRESH_SECONDS", 30))  # pick up keys created by other workers
+KEY_FILTER_REBUILD_SECONDS = int(os.getenv("KEY_FILTER_REBUILD_SECONDS", 3600))  # drop revoked keys
 
 # CORS Configuration
 CORS_ORIGINS = os.getenv("CORS_ORIGINS")
@@ -1,7 +1,34 @@
-from pymongo import MongoClient, ASCENDING
-from datetime import datetime
-from app.config.settings import MONGODB_URI, DB_NAME
-from app.models.api_key import ApiKey, generate_api_key
+from pymongo import MongoClient, ASCENDING, UpdateOne
+from pymongo.errors import OperationFailure, BulkWriteError
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from app.config.settings import (
+    MONGODB_URI, MONGODB_TIMEOUT_MS, DB_NAME,
+    USAGE_MINUTE_RETENTION_HOURS, USAGE_HOUR_RETENTION_DAYS, USAGE_DAY_RETENTION_DAYS
+)
+from app.models.api_key import ApiKey, generate_api_key, hash_api_key, api_key_prefix
+from app.utils.key_filter import ApiKeyFilter
+
+# Rollup granularities and how long their buckets are kept (None keeps them forever)
+USAGE_GRANULARITIES = {
+    "minute": timedelta(hours=USAGE_MINUTE_RETENTION_HOURS),
+    "hour": timedelta(days=USAGE_HOUR_RETENTION_DAYS),
+    "day": timedelta(days=USAGE_DAY_RETENTION_DAYS) if USAGE_DAY_RETENTION_DAYS > 0 else None
+}
+
+# Tries of the usage write when the day bucket is created concurrently
+USAGE_WRITE_ATTEMPTS = 3
+# Lifetime counter per key, kept next to the rollups so a request touches one collection
+TOTAL_GRANULARITY = "total"
+TOTAL_BUCKET = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def usage_bucket(moment: datetime, granularity: str) -> datetime:
+    """Truncate a UTC datetime to the start of its usage bucket."""
+    if granularity == "minute":
+        return moment.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
 
 class ApiKeyManager:
     _instance = None
@@ -9,65 +36,211 @@ class ApiKeyManager:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(ApiKeyManager, cls).__new__(cls)
-            cls._instance.client = MongoClient(MONGODB_URI)
+            cls._instance.client = MongoClient(
+                MONGODB_URI, tz_aware=True,
+                serverSelectionTimeoutMS=MONGODB_TIMEOUT_MS, connectTimeoutMS=MONGODB_TIMEOUT_MS
+            )
             cls._instance.db = cls._instance.client[DB_NAME]
             cls._instance.collection = cls._instance.db["api_keys"]
-            cls._instance.create_indexes()
+            cls._instance.usage = cls._instance.db["api_usage"]
         return cls._instance
     
     def create_indexes(self):
-        """Create indexes for API keys collection."""
-        self.collection.create_index([("key", ASCENDING)], unique=True)
+        """Create indexes for API keys and usage collections."""
+        self.drop_plaintext_key_index()
+        self.collection.create_index([("key_hash", ASCENDING)], unique=True)
         self.collection.create_index([("user_email", ASCENDING)])
+        # Incremental filter refreshes read keys by creation time
+        self.collection.create_index([("created_at", ASCENDING)])
+        # One counter document per key hash, granularity and bucket
+        self.usage.create_index(
+            [("key", ASCENDING), ("granularity", ASCENDING), ("bucket", ASCENDING)],
+            unique=True
+        )
+        # Compaction: fine-grained buckets expire once their coarser rollups cover them
+        self.usage.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+    
+    def drop_plaintext_key_index(self):
+        """Drop the unique index on the legacy plaintext key field, if it is still there."""
+        try:
+            self.collection.drop_index("key_1")
+        except OperationFailure:
+            pass
     
     def create_api_key(self, user_email: str, user_name: str, tier: str = "free") -> str:
-        """Create a new API key for a user."""
+        """Create a new API key for a user. The key is returned here and never stored."""
+        key = generate_api_key()
         api_key = ApiKey(
+            key_hash=hash_api_key(key),
+            key_prefix=api_key_prefix(key),
             user_email=user_email,
             user_name=user_name,
             tier=tier
         )
         
         self.collection.insert_one(api_key.dict())
-        return api_key.key
+        ApiKeyFilter().add(api_key.key_hash)
+        return key
     
     def get_api_key(self, key: str) -> ApiKey:
         """Get API key details by key."""
-        result = self.collection.find_one({"key": key})
+        result = self.collection.find_one({"key_hash": hash_api_key(key)}, {"daily_requests": 0})
         if result:
             return ApiKey(**result)
         return None
     
-    def validate_api_key(self, key: str) -> bool:
-        """Validate if API key exists and is active."""
-        result = self.collection.find_one({"key": key, "is_active": True})
-        return bool(result)
+    def validate_api_key(self, key: str) -> Optional[str]:
+        """Return the tier of the API key if it exists and is active, otherwise None."""
+        result = self.collection.find_one({"key_hash": hash_api_key(key), "is_active": True}, {"tier": 1, "_id": 0})
+        return result.get("tier", "free") if result else None
+    
+    def count_active_keys(self) -> int:
+        return self.collection.count_documents({"is_active": True})
     
-    def update_key_usage(self, key: str):
-        """Update the usage statistics for an API key."""
-        today = datetime.now().strftime("%Y-%m-%d")
+    def iter_active_key_hashes(self, since: datetime = None):
+        """Yield (key_hash, created_at) of active keys, optionally only those created since `since`."""
+        query = {"is_active": True}
+        if since:
+            query["created_at"] = {"$gte": since}
+        for doc in self.collection.find(query, {"key_hash": 1, "created_at": 1, "_id": 0}, batch_size=10000):
+            yield doc["key_hash"], doc.get("created_at")
+    
+    def update_key_usage(self, key: str, count: int = 1, daily_limit: Optional[int] = None) -> bool:
+        """
+        Charge `count` requests to an API key in one round trip. With a
+        `daily_limit`, nothing is charged and False is returned when today's
+        counter would exceed it.
+        """
+        if daily_limit is not None and count > daily_limit:
+            return False
+        now = datetime.now(timezone.utc)
+        key = hash_api_key(key)
         
-        self.collection.update_one(
-            {"key": key},
-            {
-                "$inc": {
-                    "total_requests": 1,
-                    f"daily_requests.{today}": 1
-                },
-                "$set": {
-                    "last_used": datetime.now()
-                }
-            }
+        # Maintain every rollup at write time so reads never aggregate raw events.
+        # The day bucket goes first: when it is already at the limit its filter
+        # does not match, the upsert hits the unique index, and the ordered
+        # write stops before anything else is charged. Two requests creating
+        # the bucket at once hit the same error, so the counter is re-read
+        # before a duplicate key is taken to mean the limit was reached.
+        operations = []
+        for granularity in ("day", "hour", "minute"):
+            bucket = usage_bucket(now, granularity)
+            query = {"key": key, "granularity": granularity, "bucket": bucket}
+            if granularity == "day" and daily_limit is not None:
+                query["count"] = {"$lte": daily_limit - count}
+            update = {"$inc": {"count": count}}
+            retention = USAGE_GRANULARITIES[granularity]
+            if retention:
+                update["$setOnInsert"] = {"expires_at": bucket + retention}
+            operations.append(UpdateOne(query, update, upsert=True))
+        operations.append(UpdateOne(
+            {"key": key, "granularity": TOTAL_GRANULARITY, "bucket": TOTAL_BUCKET},
+            {"$inc": {"count": count}, "$set": {"last_used": now}},
+            upsert=True
+        ))
+        for attempt in range(USAGE_WRITE_ATTEMPTS):
+            try:
+                self.usage.bulk_write(operations, ordered=True)
+                return True
+            except BulkWriteError as e:
+                error = e.details["writeErrors"][0]
+                if daily_limit is None or error["index"] != 0 or error["code"] != 11000:
+                    raise
+                day = self.usage.find_one(
+                    {"key": key, "granularity": "day", "bucket": usage_bucket(now, "day")}, {"count": 1, "_id": 0}
+                )
+                if day and day["count"] + count > daily_limit:
+                    return False
+                if attempt == USAGE_WRITE_ATTEMPTS - 1:
+                    raise
+    
+    def get_current_usage(self, key: str, granularity: str = "day") -> int:
+        """Get the request count of the current bucket, e.g. today's requests."""
+        bucket = usage_bucket(datetime.now(timezone.utc), granularity)
+        result = self.usage.find_one(
+            {"key": hash_api_key(key), "granularity": granularity, "bucket": bucket},
+            {"count": 1, "_id": 0}
         )
+        return result["count"] if result else 0
+    
+    def get_usage_report(self, keys, granularity: str, start: datetime, end: datetime):
+        """Get rollup buckets for the given key hashes within [start, end]."""
+        cursor = self.usage.find(
+            {
+                "key": {"$in": list(keys)},
+                "granularity": granularity,
+                "bucket": {"$gte": usage_bucket(start, granularity), "$lte": end}
+            },
+            {"key": 1, "bucket": 1, "count": 1, "_id": 0}
+        ).sort([("key", ASCENDING), ("bucket", ASCENDING)])
+        report = {key: [] for key in keys}
+        for row in cursor:
+            report[row["key"]].append({"bucket": row["bucket"], "count": row["count"]})
+        return report
+    
+    def migrate_plaintext_keys(self):
+        """Replace legacy plaintext keys with their hash and prefix, in the key documents and in usage."""
+        self.drop_plaintext_key_index()
+        migrated = 0
+        for doc in self.collection.find({"key": {"$exists": True}}, {"key": 1}):
+            key_hash = hash_api_key(doc["key"])
+            self.collection.update_one(
+                {"_id": doc["_id"]},
+                {"$set": {"key_hash": key_hash, "key_prefix": api_key_prefix(doc["key"])}, "$unset": {"key": ""}}
+            )
+            self.usage.update_many({"key": doc["key"]}, {"$set": {"key": key_hash}})
+            migrated += 1
+        return migrated
+    
+    def migrate_daily_requests(self):
+        """Move legacy per-key daily_requests maps into day buckets."""
+        migrated = 0
+        for doc in self.collection.find({"daily_requests": {"$exists": True}}, {"key_hash": 1, "daily_requests": 1}):
+            operations = []
+            for day, count in (doc.get("daily_requests") or {}).items():
+                try:
+                    bucket = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+                except ValueError:
+                    continue
+                retention = USAGE_GRANULARITIES["day"]
+                update = {"$max": {"count": count}}
+                if retention:
+                    update["$setOnInsert"] = {"expires_at": bucket + retention}
+                operations.append(UpdateOne(
+                    {"key": doc["key_hash"], "granularity": "day", "bucket": bucket}, update, upsert=True
+                ))
+            if operations:
+                self.usage.bulk_write(operations, ordered=False)
+            self.collection.update_one({"_id": doc["_id"]}, {"$unset": {"daily_requests": ""}})
+            migrated += 1
+        return migrated
     
     def deactivate_api_key(self, key: str):
         """Deactivate an API key."""
-        self.collection.update_one(
-            {"key": key},
+        self.deactivate_key_hash(hash_api_key(key))
+    
+    def deactivate_key_hash(self, key_hash: str):
+        """Deactivate an API key by its stored hash, for callers that never see the key itself."""
+        result = self.collection.update_one(
+            {"key_hash": key_hash, "is_active": True},
             {"$set": {"is_active": False}}
         )
+        if result.modified_count:
+            # Drop the revoked key from every filter bit it set
+            ApiKeyFilter().request_rebuild()
     
     def get_user_keys(self, user_email: str):
         """Get all API keys for a specific user."""
-        keys = self.collection.find({"user_email": user_email})
-        return [ApiKey(**key) for key in keys]
+        keys = [ApiKey(**key) for key in self.collection.find({"user_email": user_email}, {"daily_requests": 0})]
+        # Totals kept on the key documents themselves predate the usage counters and are added to them
+        totals = self.usage.find(
+            {"key": {"$in": [key.key_hash for key in keys]}, "granularity": TOTAL_GRANULARITY, "bucket": TOTAL_BUCKET},
+            {"key": 1, "count": 1, "last_used": 1, "_id": 0}
+        )
+        by_key = {total["key"]: total for total in totals}
+        for key in keys:
+            total = by_key.get(key.key_hash)
+            if total:
+                key.total_requests += total["count"]
+                key.last_used = max(filter(None, (key.last_used, total.get("last_used"))), default=None)
+        return keys
@@ -0,0 +1,194 @@
+import bisect
+import logging
+import sys
+import threading
+import time
+from array import array
+from pymongo.errors import PyMongoError
+from app.config.settings import MEMORY_STORE_MAX_ARTICLES
+from app.db.mongodb import MongoDB, as_utc
+from app.utils.fieldsets import DEFAULT_PROJECTION
+
+logger = logging.getLogger(__name__)
+
+# Fields held in slots; anything else an article carries goes to `extra`
+ARTICLE_FIELDS = ("title", "content", "url", "source", "timestamp", "published_at", "timestamp_iso", "categories", "ingested_at")
+
+class ArticleRecord:
+    """One article of the hot window, with interned source and category strings."""
+    __slots__ = ("_id",) + ARTICLE_FIELDS + ("extra",)
+
+    def __init__(self, document, categories_cache):
+        self._id = document["_id"]
+        for field in ARTICLE_FIELDS:
+            setattr(self, field, document.get(field))
+        if self.source is not None:
+            self.source = sys.intern(self.source)
+        categories = tuple(sys.intern(category) for category in self.categories or ())
+        self.categories = categories_cache.setdefault(categories, categories)
+        extra = {key: value for key, value in document.items() if key != "_id" and key not in ARTICLE_FIELDS}
+        self.extra = extra or None
+
+    def to_dict(self):
+        document = {"_id": self._id}
+        for field in ARTICLE_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                document[field] = list(value) if field == "categories" else value
+        if self.extra:
+            document.update(self.extra)
+        return document
+
+    def size(self):
+        """Bytes held by this record, not counting shared interned strings."""
+        total = sys.getsizeof(self)
+        for value in (self.title, self.content, self.url, self.timestamp, self.timestamp_iso, self.published_at, self.ingested_at):
+            if value is not None:
+                total += sys.getsizeof(value)
+        if self.extra:
+            total += sys.getsizeof(self.extra) + sum(sys.getsizeof(value) for value in self.extra.values())
+        return total
+
+def _sort_key(published_at):
+    # Negated microseconds, so newest-first lists are ascending for bisect
+    return -int(as_utc(published_at).timestamp() * 1_000_000)
+
+class ArticleIndex:
+    """Positions into the record list for one filter, with their sort keys."""
+    __slots__ = ("positions", "keys")
+
+    def __init__(self):
+        self.positions = array("I")
+        self.keys = array("q")
+
+class MemoryView:
+    """
+    Immutable, read-optimized copy of the newest articles for one scrape generation.
+    """
+
+    def __init__(self, generation, documents, complete):
+        self.generation = generation
+        # True when the window holds the whole archive, not just its newest part
+        self.complete = complete
+        categories_cache = {}
+        self.records = [ArticleRecord(document, categories_cache) for document in documents]
+        self.all = ArticleIndex()
+        self.by_category = {}
+        self.by_source = {}
+        for position, record in enumerate(self.records):
+            key = _sort_key(record.published_at)
+            indexes = [self.all, self.by_source.setdefault(record.source, ArticleIndex())]
+            indexes += [self.by_category.setdefault(category, ArticleIndex()) for category in record.categories]
+            for index in indexes:
+                index.positions.append(position)
+                index.keys.append(key)
+        self.bytes = sum(record.size() for record in self.records) + sys.getsizeof(self.records) + sum(
+            index.positions.itemsize * len(index.positions) * 2
+            for index in [self.all, *self.by_category.values(), *self.by_source.values()]
+        )
+
+    def query(self, limit, skip=0, ascending=False, category=None, source=None, start=None, end=None):
+        """
+        Articles as dicts, newest first unless `ascending`. Returns None when the
+        answer might include articles older than the window, so the caller can
+        go to Mongo instead.
+        """
+        if category is not None:
+            index = self.by_category.get(category)
+        elif source is not None:
+            index = self.by_source.get(source)
+        else:
+            index = self.all
+        if index is None:
+            return [] if self.complete else None
+
+        low = bisect.bisect_left(index.keys, _sort_key(end)) if end is not None else 0
+        high = bisect.bisect_right(index.keys, _sort_key(start)) if start is not None else len(index.keys)
+        reaches_window_end = high == len(index.keys)
+        if ascending:
+            # Oldest first only works if nothing older than the window can match
+            if reaches_window_end and not self.complete:
+                return None
+            window = range(high - 1, low - 1, -1)
+        else:
+            window = range(low, high)
+        selected = window[skip:skip + limit]
+        if not ascending and not self.complete and reaches_window_end and len(selected) < limit:
+            return None
+        return [self.records[index.positions[position]].to_dict() for position in selected]
+
+    def stats(self):
+        count = len(self.records)
+        return {
+            "generation": self.generation,
+            "articles": count,
+            "complete": self.complete,
+            "bytes": self.bytes,
+            "bytes_per_article": round(self.bytes / count) if count else 0
+        }
+
+class MemoryStore:
+    """
+    Holds the current MemoryView and rebuilds it in the background whenever a
+    new scrape generation is published. Readers only get a view that matches
+    their generation, so a rebuild in progress never serves mismatched data.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(MemoryStore, cls).__new__(cls)
+            cls._instance.current = None
+            cls._instance.wanted = 0
+            cls._instance.building = False
+            cls._instance.lock = threading.Lock()
+        return cls._instance
+
+    def view(self, generation):
+        current = self.current
+        if current is not None and current.generation == generation:
+            return current
+        return None
+
+    def refresh(self, state):
+        """GenerationTracker listener: rebuild the window for a newer generation."""
+        if MEMORY_STORE_MAX_ARTICLES <= 0:
+            return
+        with self.lock:
+            self.wanted = max(self.wanted, state["generation"])
+            if self.building:
+                return
+            self.building = True
+        threading.Thread(target=self._rebuild, name="memory-store", daemon=True).start()
+
+    def _rebuild(self):
+        finished = False
+        try:
+            while True:
+                with self.lock:
+                    generation = self.wanted
+                    if self.current is not None and self.current.generation >= generation:
+                        # Cleared under the lock, so a refresh arriving now starts a new build
+                        self.building = False
+                        finished = True
+                        return
+                started = time.perf_counter()
+                documents = MongoDB().get_all_news(limit=MEMORY_STORE_MAX_ARTICLES + 1, projection=DEFAULT_PROJECTION)
+                complete = len(documents) <= MEMORY_STORE_MAX_ARTICLES
+                view = MemoryView(generation, documents[:MEMORY_STORE_MAX_ARTICLES], complete)
+                # Swap in one assignment, readers see either the old or the new view
+                self.current = view
+                stats = view.stats()
+                logger.info(
+                    f"Memory store rebuilt for generation {generation}: {stats['articles']} articles, "
+                    f"{stats['bytes_per_article']} bytes/article, {time.perf_counter() - started:.2f}s"
+                )
+        except PyMongoError as e:
+            logger.error(f"Memory store rebuild failed: {e}")
+        except Exception as e:
+            # e.g. legacy documents the window cannot sort; the next generation tries again
+            logger.exception(f"Unexpected memory store rebuild error: {e}")
+        finally:
+            if not finished:
+                with self.lock:
+                    self.building = False
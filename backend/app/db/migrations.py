@@ -0,0 +1,30 @@
+import logging
+from app.db.mongodb import MongoDB
+from app.db.api_key_manager import ApiKeyManager
+
+logger = logging.getLogger(__name__)
+
+def run_migrations():
+    """
+    Create indexes and migrate legacy documents. Safe to run repeatedly.
+    """
+    db = MongoDB()
+    db.create_indexes()
+    logger.info("News indexes created")
+    backfilled = db.backfill_published_at()
+    if backfilled:
+        logger.info(f"Backfilled published_at on {backfilled} archived articles")
+    keyed = db.backfill_article_keys()
+    if keyed:
+        logger.info(f"Backfilled article_key on {keyed} archived articles")
+
+    api_key_manager = ApiKeyManager()
+    # Hash legacy plaintext keys before the unique key_hash index is built
+    hashed = api_key_manager.migrate_plaintext_keys()
+    if hashed:
+        logger.info(f"Replaced {hashed} plaintext API keys with their hashes")
+    api_key_manager.create_indexes()
+    logger.info("API key indexes created")
+    migrated = api_key_manager.migrate_daily_requests()
+    if migrated:
+        logger.info(f"Moved daily usage of {migrated} API keys into usage rollups")
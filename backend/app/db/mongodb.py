@@ -1,10 +1,47 @@
 import datetime
-from pymongo import MongoClient
-from app.config.settings import MONGODB_URI, DB_NAME, COLLECTION_NAME
-from passlib.context import CryptContext
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from pymongo import MongoClient, ASCENDING, DESCENDING, UpdateOne, ReturnDocument
+from pymongo.errors import BulkWriteError
+from app.config.settings import (
+    MONGODB_URI, MONGODB_TIMEOUT_MS, DB_NAME, COLLECTION_NAME, NEWS_FEED_TIMEZONE, NEWS_RETENTION_DAYS, GOOGLE_SEARCH_URL
+)
 from app.models.user import UserCreate, UserInDB
+from app.utils.query_shapes import FILTER_FIELDS, sort_spec
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache(maxsize=1)
+def pwd_context():
+    # passlib and bcrypt are only needed by the auth endpoints, so load them on first use
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def article_key(article):
+    """
+    Identity of an article across scrapes: its link, or for articles without one
+    (the parser falls back to a search URL) the title and the feed-local day it
+    was published, so recurring daily headlines are archived once a day.
+    """
+    url = article.get("url")
+    if url and not url.startswith(GOOGLE_SEARCH_URL):
+        return url
+    day = article["published_at"].astimezone(ZoneInfo(NEWS_FEED_TIMEZONE)).date().isoformat()
+    return f"{article['title']}|{day}"
+
+def pending_enrichment_query(now):
+    """Articles not enriched yet, except those whose page failed and waits for a retry."""
+    return {"enriched_at": {"$exists": False}, "enrich_retry_after": {"$not": {"$gt": now}}}
+
+def keyset_query(query, after):
+    """
+    Narrow `query` to articles after the (published_at, _id) of the last one
+    already returned, in newest-first order.
+    """
+    published_at, last_id = after
+    # The top-level bound lets the planner scan the index from there instead of from the start
+    return {**query, "published_at": {"$lte": published_at}, "$or": [
+        {"published_at": {"$lt": published_at}},
+        {"published_at": published_at, "_id": {"$lt": last_id}}
+    ]}
 
 class MongoDB:
     _instance = None
@@ -12,31 +49,74 @@ class MongoDB:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(MongoDB, cls).__new__(cls)
-            cls._instance.client = MongoClient(MONGODB_URI)
+            cls._instance.client = MongoClient(
+                MONGODB_URI, tz_aware=True,
+                serverSelectionTimeoutMS=MONGODB_TIMEOUT_MS, connectTimeoutMS=MONGODB_TIMEOUT_MS
+            )
             cls._instance.db = cls._instance.client[DB_NAME]
             cls._instance.collection = cls._instance.db[COLLECTION_NAME]
         return cls._instance
     
     def insert_news(self, news_data):
         """
-        Insert news data into MongoDB
-        """
-        if isinstance(news_data, list):
-            # Check for duplicates by title and avoid inserting them
-            for article in news_data:
-                existing = self.collection.find_one({"title": article["title"]})
-                if not existing:
-                    self.collection.insert_one(article)
-        elif isinstance(news_data, dict):
-            existing = self.collection.find_one({"title": news_data["title"]})
-            if not existing:
-                self.collection.insert_one(news_data)
-    
-    def get_all_news(self, limit=100, skip=0, sort_by="timestamp_iso", sort_order=-1):
+        Insert news data into MongoDB, keeping the first-seen copy of each article (see article_key).
+        Returns the number of newly archived articles.
+        """
+        return len(self.archive_news(news_data))
+
+    def archive_news(self, news_data):
+        """
+        Same as insert_news, but returns the newly archived articles with their ingested_at.
+        """
+        if isinstance(news_data, dict):
+            news_data = [news_data]
+        if not news_data:
+            return []
+        now = datetime.datetime.now(datetime.timezone.utc)
+        operations = [
+            UpdateOne(
+                {"article_key": article_key(article)},
+                {"$setOnInsert": {**article, "ingested_at": now}},
+                upsert=True
+            )
+            for article in news_data
+        ]
+        result = self.collection.bulk_write(operations, ordered=False)
+        return [{**news_data[index], "ingested_at": now} for index in sorted(result.upserted_ids)]
+
+    def _time_filter(self, query, start=None, end=None):
+        """
+        Add a published_at range to a query. Naive datetimes are treated as UTC.
+        """
+        time_range = {}
+        if start is not None:
+            time_range["$gte"] = as_utc(start)
+        if end is not None:
+            time_range["$lte"] = as_utc(end)
+        if time_range:
+            query = {**query, "published_at": time_range}
+        return query
+
+    def _find_latest(self, query, limit, skip, start=None, end=None, projection=None):
+        cursor = self.collection.find(self._time_filter(query, start, end), projection) \
+            .sort(sort_spec()).skip(skip).limit(limit)
+        return list(cursor)
+
+    def get_news_page(self, query, limit, after=None, projection=None):
+        """
+        Newest-first keyset page. `after` is the (published_at, _id) of the last
+        article already returned, so deep pages never skip through the archive.
         """
-        Get all news articles with pagination
+        if after is not None:
+            query = keyset_query(query, after)
+        return self._find_latest(query, limit, 0, projection=projection)
+
+    def get_all_news(self, limit=100, skip=0, sort_by="published_at", sort_order=-1, start=None, end=None, projection=None):
+        """
+        Get all news articles with pagination. `sort_by` must be one of SORT_FIELDS.
         """
-        cursor = self.collection.find({}).sort(sort_by, sort_order).skip(skip).limit(limit)
+        cursor = self.collection.find(self._time_filter({}, start, end), projection) \
+            .sort(sort_spec(sort_by, sort_order)).skip(skip).limit(limit)
         return list(cursor)
     
     def get_news_by_id(self, news_id):
@@ -45,42 +125,171 @@ class MongoDB:
         """
         return self.collection.find_one({"_id": news_id})
     
-    def get_news_by_category(self, category, limit=100, skip=0):
+    def get_news_by_category(self, category, limit=100, skip=0, start=None, end=None, projection=None):
         """
         Get news articles by category
         """
-        cursor = self.collection.find({"categories": category}).sort("timestamp_iso", -1).skip(skip).limit(limit)
-        return list(cursor)
+        return self._find_latest({FILTER_FIELDS["category"]: category}, limit, skip, start, end, projection)
+
+    def get_news_by_source(self, source, limit=100, skip=0, start=None, end=None, projection=None):
+        """
+        Get news articles by source
+        """
+        return self._find_latest({FILTER_FIELDS["source"]: source}, limit, skip, start, end, projection)
     
-    def search_news(self, query, limit=100, skip=0):
+    def search_news(self, query, limit=100, skip=0, start=None, end=None, projection=None):
         """
         Search news articles by query
         """
         # Text-based search using the text index
-        cursor = self.collection.find(
-            {"$text": {"$search": query}}
-        ).sort("timestamp_iso", -1).skip(skip).limit(limit)
+        return self._find_latest({"$text": {"$search": query}}, limit, skip, start, end, projection)
+
+    def get_news_to_enrich(self, limit):
+        """
+        Newest articles that have not been through enrichment yet and are not waiting for a retry
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cursor = self.collection.find(pending_enrichment_query(now), {"url": 1, "content": 1}) \
+            .sort(sort_spec()).limit(limit)
         return list(cursor)
 
+    def save_enrichment(self, updates):
+        """
+        Apply (article_id, fields) pairs from an enrichment pass in one bulk write
+        """
+        if not updates:
+            return 0
+        result = self.collection.bulk_write(
+            [UpdateOne({"_id": article_id}, {"$set": fields}) for article_id, fields in updates],
+            ordered=False
+        )
+        return result.modified_count
+
     def create_indexes(self):
         """
         Create indexes for faster querying
         """
         # Create text index for search
         self.collection.create_index([("title", "text"), ("content", "text")])
-        # Create index for timestamp for faster sorting
-        self.collection.create_index("timestamp_iso")
-        # Create index for category for faster filtering
-        self.collection.create_index("categories")
-        # Create index for source for filtering by source
-        self.collection.create_index("source")
+        # Articles are identified by article_key; titles repeat across days
+        self._drop_unique_title_index()
+        # Legacy duplicates are left without a key, so the index only covers documents that have one
+        self.collection.create_index(
+            "article_key", unique=True, partialFilterExpression={"article_key": {"$exists": True}}
+        )
+        # Compound indexes serve both the filter and the newest-first sort for time ranges
+        self.collection.create_index([("published_at", DESCENDING), ("_id", DESCENDING)])
+        self.collection.create_index([("categories", ASCENDING), ("published_at", DESCENDING), ("_id", DESCENDING)])
+        self.collection.create_index([("source", ASCENDING), ("published_at", DESCENDING), ("_id", DESCENDING)])
+        # Enrichment passes read unenriched articles newest first; a missing enriched_at
+        # indexes as null, so already enriched articles are never walked
+        self.collection.create_index([("enriched_at", ASCENDING), ("published_at", DESCENDING), ("_id", DESCENDING)])
+        self._ensure_retention_index()
+        # Login and registration look users up by email
+        self.get_user_collection().create_index("email")
+
+    def _drop_unique_title_index(self):
+        existing = self.collection.index_information().get("title_1")
+        if existing is not None and existing.get("unique"):
+            self.collection.drop_index("title_1")
+
+    def _ensure_retention_index(self):
+        """
+        Keep the TTL index on published_at in line with NEWS_RETENTION_DAYS
+        """
+        index_name = "published_at_1"
+        existing = self.collection.index_information().get(index_name)
+        if NEWS_RETENTION_DAYS > 0:
+            expire_after = NEWS_RETENTION_DAYS * 24 * 60 * 60
+            if existing is None:
+                self.collection.create_index("published_at", expireAfterSeconds=expire_after)
+            elif existing.get("expireAfterSeconds") != expire_after:
+                self.db.command(
+                    "collMod", self.collection.name,
+                    index={"name": index_name, "expireAfterSeconds": expire_after}
+                )
+        elif existing is not None and "expireAfterSeconds" in existing:
+            self.collection.drop_index(index_name)
+
+    def backfill_published_at(self):
+        """
+        Convert articles stored before the archive existed to native datetimes
+        """
+        result = self.collection.update_many(
+            {"published_at": {"$exists": False}},
+            [{"$set": {
+                "published_at": {"$dateFromString": {
+                    "dateString": "$timestamp_iso",
+                    "timezone": NEWS_FEED_TIMEZONE,
+                    "onError": "$$NOW",
+                    "onNull": "$$NOW"
+                }},
+                "ingested_at": "$$NOW"
+            }}]
+        )
+        return result.modified_count
+
+    def backfill_article_keys(self, batch_size=1000):
+        """
+        Set article_key on articles archived before it existed. Documents whose
+        key is already taken are duplicates from before and stay without one.
+        """
+        backfilled = 0
+        while True:
+            documents = list(self.collection.find(
+                {"article_key": {"$exists": False}, "published_at": {"$exists": True}, "backfill_skipped": {"$exists": False}},
+                {"title": 1, "url": 1, "published_at": 1}
+            ).limit(batch_size))
+            if not documents:
+                return backfilled
+            operations = [
+                UpdateOne({"_id": document["_id"]}, {"$set": {"article_key": article_key(document)}})
+                for document in documents
+            ]
+            try:
+                backfilled += self.collection.bulk_write(operations, ordered=False).modified_count
+            except BulkWriteError as e:
+                backfilled += e.details["nModified"]
+                # Mark the duplicates so the next batch does not pick them up again
+                duplicates = [documents[error["index"]]["_id"] for error in e.details["writeErrors"]]
+                self.collection.update_many({"_id": {"$in": duplicates}}, {"$set": {"backfill_skipped": True}})
+
+    def get_generation(self):
+        """
+        Get the currently published scrape generation
+        """
+        state = self.db["scrape_state"].find_one({"_id": "news"})
+        if not state:
+            return {"generation": 0, "published_at": None}
+        return {"generation": state["generation"], "published_at": state["published_at"]}
+
+    def publish_generation(self):
+        """
+        Mark a scrape as published by bumping the generation counter
+        """
+        state = self.db["scrape_state"].find_one_and_update(
+            {"_id": "news"},
+            {
+                "$inc": {"generation": 1},
+                "$set": {"published_at": datetime.datetime.now(datetime.timezone.utc)}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return {"generation": state["generation"], "published_at": state["published_at"]}
+
+    def ping(self):
+        """
+        Check that the database is reachable
+        """
+        self.client.admin.command("ping")
 
     def get_user_collection(self):
         return self.db["users"]
 
     def create_user(self, user: UserCreate):
         user_collection = self.get_user_collection()
-        hashed_password = pwd_context.hash(user.password)
+        hashed_password = pwd_context().hash(user.password)
         user_in_db = {
             "email": user.email,
             "name": user.name,
@@ -96,4 +305,10 @@ class MongoDB:
         return user
 
     def verify_password(self, plain_password, hashed_password):
-        return pwd_context.verify(plain_password, hashed_password)
+        return pwd_context().verify(plain_password, hashed_password)
+
+
+def as_utc(value):
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
@@ -0,0 +1,167 @@
+import datetime
+from bson import ObjectId
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+from app.config.settings import COLLECTION_NAME
+from app.db.mongodb import MongoDB, keyset_query, pending_enrichment_query
+from app.db.api_key_manager import TOTAL_GRANULARITY, TOTAL_BUCKET
+from app.utils.query_shapes import SORT_FIELDS, SORT_ORDERS, FILTER_FIELDS, sort_spec
+
+# Plan stages that read more than the query returns
+BAD_STAGES = {"COLLSCAN": "collection scan", "SORT": "blocking sort"}
+# A plan may use indexes and still read far more documents than it returns,
+# e.g. filtering an index walk. Flagged past this many examined per returned,
+# plus SAMPLE_LIMIT of slack so small collections do not trip it.
+MAX_EXAMINED_PER_RETURNED = 10
+WASTEFUL_SCAN = "EXAMINED"
+# Sample values; the planner only looks at the shape of the query
+SAMPLE_TIME = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+SAMPLE_HASH = "0" * 64
+SAMPLE_EMAIL = "user@example.com"
+SAMPLE_LIMIT = 20
+
+class QueryShape:
+    """
+    One filter and sort the API sends to MongoDB. `allowed` maps stages from
+    BAD_STAGES, or WASTEFUL_SCAN, that are accepted for this shape to the reason why.
+    """
+    __slots__ = ("name", "collection", "filter", "sort", "allowed")
+
+    def __init__(self, name, collection, filter, sort=None, allowed=None):
+        self.name = name
+        self.collection = collection
+        self.filter = filter
+        self.sort = sort
+        self.allowed = allowed or {}
+
+def query_shapes():
+    """Every query shape behind the news and auth endpoints."""
+    time_range = {"published_at": {"$gte": SAMPLE_TIME, "$lte": SAMPLE_TIME}}
+    after = (SAMPLE_TIME, ObjectId())
+    shapes = []
+    sorted_fields = set()
+    for sort_by, field in SORT_FIELDS.items():
+        if field in sorted_fields:
+            continue  # aliases run the same query
+        sorted_fields.add(field)
+        for order in SORT_ORDERS:
+            shapes.append(QueryShape(f"GET /news sort_by={sort_by} sort_order={order}", COLLECTION_NAME, {}, sort_spec(sort_by, order)))
+            shapes.append(QueryShape(f"GET /news sort_by={sort_by} sort_order={order} from/to", COLLECTION_NAME, time_range, sort_spec(sort_by, order)))
+    shapes.append(QueryShape("POST /news/batch latest next page", COLLECTION_NAME, keyset_query({}, after), sort_spec()))
+    for name, field in FILTER_FIELDS.items():
+        shapes += [
+            QueryShape(f"GET /news/{name}/...", COLLECTION_NAME, {field: "sample"}, sort_spec()),
+            QueryShape(f"GET /news/{name}/... from/to", COLLECTION_NAME, {field: "sample", **time_range}, sort_spec()),
+            QueryShape(f"POST /news/batch {name} next page", COLLECTION_NAME, keyset_query({field: "sample"}, after), sort_spec())
+        ]
+    shapes += [
+        QueryShape(
+            "GET /news/search", COLLECTION_NAME, {"$text": {"$search": "sensex"}}, sort_spec(),
+            allowed={
+                "SORT": "text matches come back in no particular order, so they are sorted after the text index lookup",
+                WASTEFUL_SCAN: "every text match is read so the newest can be picked"
+            }
+        ),
+        QueryShape("enrichment pass", COLLECTION_NAME, pending_enrichment_query(SAMPLE_TIME), sort_spec()),
+        QueryShape("API key check", "api_keys", {"key_hash": SAMPLE_HASH, "is_active": True}),
+        QueryShape("GET /auth/user/api-keys", "api_keys", {"user_email": SAMPLE_EMAIL}),
+        QueryShape("API key filter refresh", "api_keys", {"is_active": True, "created_at": {"$gte": SAMPLE_TIME}}),
+        QueryShape("daily quota", "api_usage", {"key": SAMPLE_HASH, "granularity": "day", "bucket": SAMPLE_TIME, "count": {"$lte": 100}}),
+        QueryShape(
+            "GET /auth/user/api-keys totals", "api_usage",
+            {"key": {"$in": [SAMPLE_HASH]}, "granularity": TOTAL_GRANULARITY, "bucket": TOTAL_BUCKET}
+        ),
+        QueryShape(
+            "GET /auth/user/api-keys/usage", "api_usage",
+            {"key": {"$in": [SAMPLE_HASH]}, "granularity": "day", "bucket": {"$gte": SAMPLE_TIME, "$lte": SAMPLE_TIME}},
+            [("key", ASCENDING), ("bucket", ASCENDING)]
+        ),
+        QueryShape("POST /auth/user/login", "users", {"email": SAMPLE_EMAIL})
+    ]
+    return shapes
+
+def plan_stages(plan):
+    """Stage names anywhere in an explain() winning plan, classic or slot-based."""
+    stages = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if isinstance(node.get("stage"), str):
+                stages.append(node["stage"])
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return stages
+
+def suggest_index(shape):
+    """
+    Compound index for a shape by the equality, sort, range rule: equality
+    fields first, then the sort, then range fields.
+    """
+    equality, ranges = [], []
+    for field, condition in shape.filter.items():
+        if field.startswith("$"):
+            continue
+        # {"$exists": False} is an equality match on null in an index
+        if isinstance(condition, dict) and not set(condition) <= {"$eq", "$in"} and condition != {"$exists": False}:
+            ranges.append(field)
+        else:
+            equality.append(field)
+    index = [(field, ASCENDING) for field in equality]
+    index += [(field, order) for field, order in shape.sort or [] if field not in equality]
+    index += [(field, ASCENDING) for field in ranges if field not in dict(index)]
+    return index
+
+def explain(db, shape):
+    """Run the shape with explain("executionStats"), which reports documents examined as well as the plan."""
+    find = {"find": shape.collection, "filter": shape.filter, "limit": SAMPLE_LIMIT}
+    if shape.sort:
+        find["sort"] = dict(shape.sort)
+    return db.command("explain", find, verbosity="executionStats")
+
+def wasteful_scan(stats):
+    """Problem text when a plan examined far more documents than it returned, else None."""
+    examined, returned = stats.get("totalDocsExamined", 0), stats.get("nReturned", 0)
+    if examined > MAX_EXAMINED_PER_RETURNED * returned + SAMPLE_LIMIT:
+        return f"examined {examined} documents to return {returned}"
+    return None
+
+def check_query_plans(db=None):
+    """
+    Explain every query shape. Returns one result per shape, with `problems`
+    listing collection scans, blocking sorts and wasteful scans that are not
+    allowed for it.
+    """
+    db = db if db is not None else MongoDB().db
+    # Queries on a missing collection explain as an empty plan, which would pass every check
+    collections = set(db.list_collection_names())
+    results = []
+    for shape in query_shapes():
+        result = {"shape": shape.name, "collection": shape.collection, "stages": [], "problems": [], "allowed": []}
+        if shape.collection not in collections:
+            result["problems"].append("collection does not exist, run the migrations first")
+            results.append(result)
+            continue
+        try:
+            explained = explain(db, shape)
+            stages = plan_stages(explained["queryPlanner"]["winningPlan"])
+        except OperationFailure as e:
+            result["problems"].append(f"explain failed: {e}")
+            results.append(result)
+            continue
+        result["stages"] = stages
+        for stage in dict.fromkeys(stages):
+            if stage in shape.allowed:
+                result["allowed"].append(f"{BAD_STAGES[stage]}: {shape.allowed[stage]}")
+            elif stage in BAD_STAGES:
+                result["problems"].append(BAD_STAGES[stage])
+        waste = wasteful_scan(explained.get("executionStats", {}))
+        if waste and WASTEFUL_SCAN in shape.allowed:
+            result["allowed"].append(f"{waste}: {shape.allowed[WASTEFUL_SCAN]}")
+        elif waste:
+            result["problems"].append(waste)
+        if result["problems"]:
+            result["suggested_index"] = suggest_index(shape)
+        results.append(result)
+    return results
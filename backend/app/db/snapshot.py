@@ -0,0 +1,189 @@
+import bisect
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from array import array
+from datetime import datetime, timezone
+from app.config.settings import SNAPSHOT_PATH
+from app.utils.serialization import encode_json
+
+logger = logging.getLogger(__name__)
+
+# File layout, all little-endian:
+#   header      HEADER
+#   dictionary  JSON: {"postings": {"category": {name: [start, length]}, "source": {...}}}
+#   records     RECORD per article, newest first
+#   postings    uint32 record indexes (native order), newest first, one run per category and source
+#   bodies      each article's JSON exactly as the API serves it
+MAGIC = b"FNSNAP01"
+HEADER = struct.Struct("<8sQqIIQQQQ")  # magic, generation, published_at_us, count, dict_len, dict/records/postings/bodies offsets
+RECORD = struct.Struct("<qQI")  # published_at_us, body offset, body length
+
+def _to_us(value: datetime) -> int:
+    return int(value.astimezone(timezone.utc).timestamp() * 1_000_000)
+
+def write_snapshot(articles, generation: int, published_at: datetime, path: str = SNAPSHOT_PATH):
+    """
+    Write a newest-first list of articles to `path` atomically.
+    """
+    bodies = bytearray()
+    records = bytearray()
+    postings = {"category": {}, "source": {}}
+    for index, article in enumerate(articles):
+        body = encode_json(article)
+        records += RECORD.pack(_to_us(article["published_at"]), len(bodies), len(body))
+        bodies += body
+        for category in article.get("categories", []):
+            postings["category"].setdefault(category, array("I")).append(index)
+        postings["source"].setdefault(article.get("source"), array("I")).append(index)
+
+    posting_bytes = bytearray()
+    dictionary = {"postings": {}}
+    for kind, lists in postings.items():
+        dictionary["postings"][kind] = {}
+        for name, indexes in lists.items():
+            dictionary["postings"][kind][name] = [len(posting_bytes) // 4, len(indexes)]
+            posting_bytes += indexes.tobytes()
+    dictionary_bytes = json.dumps(dictionary, ensure_ascii=False).encode("utf-8")
+
+    dict_offset = HEADER.size
+    records_offset = dict_offset + len(dictionary_bytes)
+    postings_offset = records_offset + len(records)
+    bodies_offset = postings_offset + len(posting_bytes)
+    header = HEADER.pack(
+        MAGIC, generation, _to_us(published_at), len(articles), len(dictionary_bytes),
+        dict_offset, records_offset, postings_offset, bodies_offset
+    )
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # A private temp file per write, so overlapping writers never share one
+    fd, temp_path = tempfile.mkstemp(dir=directory or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(f.fileno(), 0o644)  # mkstemp creates files readable by the owner only
+            for chunk in (header, dictionary_bytes, records, posting_bytes, bodies):
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+class Snapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file.
+
+    Loading only parses the header and the small dictionary; records, posting
+    lists and bodies stay in the page cache and are read on demand.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mtime = os.fstat(f.fileno()).st_mtime
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.generation, published_at_us, self.count, dict_len,
+         dict_offset, self.records_offset, postings_offset, self.bodies_offset) = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            self.map.close()
+            raise ValueError(f"{path} is not a news snapshot")
+        self.published_at = datetime.fromtimestamp(published_at_us / 1_000_000, timezone.utc)
+        self.dictionary = json.loads(self.map[dict_offset:dict_offset + dict_len])
+        self.postings = memoryview(self.map)[postings_offset:self.bodies_offset].cast("I")
+
+    def _published_us(self, index: int) -> int:
+        return RECORD.unpack_from(self.map, self.records_offset + index * RECORD.size)[0]
+
+    def _body(self, index: int) -> bytes:
+        _, offset, length = RECORD.unpack_from(self.map, self.records_offset + index * RECORD.size)
+        start = self.bodies_offset + offset
+        return self.map[start:start + length]
+
+    def query(self, category=None, source=None, start=None, end=None, skip=0, limit=20, ascending=False):
+        """
+        Newest-first (or oldest-first) article bodies, filtered like the Mongo queries.
+        """
+        if category is not None or source is not None:
+            kind, name = ("category", category) if category is not None else ("source", source)
+            entry = self.dictionary["postings"][kind].get(name)
+            if entry is None:
+                return []
+            indexes = self.postings[entry[0]:entry[0] + entry[1]]
+        else:
+            indexes = range(self.count)
+
+        # Records are newest first, so search on negated timestamps
+        keys = _KeyView(indexes, self._published_us)
+        low = bisect.bisect_left(keys, -_to_us(end)) if end is not None else 0
+        high = bisect.bisect_right(keys, -_to_us(start)) if start is not None else len(indexes)
+        window = range(low, high)
+        if ascending:
+            window = window[::-1]
+        return [self._body(indexes[position]) for position in window[skip:skip + limit]]
+
+    def close(self):
+        self.postings.release()
+        self.map.close()
+
+class _KeyView:
+    """Sequence of negated publication times, so bisect can search newest-first records."""
+
+    def __init__(self, indexes, published_us):
+        self.indexes = indexes
+        self.published_us = published_us
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __getitem__(self, position):
+        return -self.published_us(self.indexes[position])
+
+class SnapshotStore:
+    """
+    Process-wide handle on the latest snapshot file, reloaded when the file changes.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(SnapshotStore, cls).__new__(cls)
+            cls._instance.snapshot = None
+            cls._instance.lock = threading.Lock()
+        return cls._instance
+
+    @staticmethod
+    def _close(snapshot):
+        try:
+            snapshot.close()
+        except BufferError as e:
+            # A view into the old mapping is still alive; garbage collection unmaps it later
+            logger.warning(f"Could not close snapshot generation {snapshot.generation} yet: {e}")
+
+    def current(self):
+        """Return the newest snapshot on disk, or None if there is none."""
+        if not SNAPSHOT_PATH:
+            return None
+        try:
+            mtime = os.stat(SNAPSHOT_PATH).st_mtime
+        except FileNotFoundError:
+            return None
+        with self.lock:
+            if self.snapshot is None or self.snapshot.mtime != mtime:
+                try:
+                    previous, self.snapshot = self.snapshot, Snapshot(SNAPSHOT_PATH)
+                    logger.info(f"Loaded snapshot generation {self.snapshot.generation} ({self.snapshot.count} articles)")
+                except (OSError, ValueError, struct.error) as e:
+                    logger.error(f"Could not load snapshot {SNAPSHOT_PATH}: {e}")
+                else:
+                    # Readers query the snapshot synchronously right after current() returns,
+                    # so nothing is still reading the previous mapping
+                    if previous is not None:
+                        self._close(previous)
+            return self.snapshot
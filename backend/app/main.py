@@ -1,35 +1,63 @@
 import logging
-import uvicorn
+import threading
+import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse, HTMLResponse
-from app.api import news, auth
-from app.utils.scheduler import start_scheduler
-from app.config.settings import API_PREFIX, CORS_ORIGINS
-from app.db.mongodb import MongoDB
-from app.scraper.news_feed_scraper import NewsFeedScraper
+from app.api import news, auth, health
+from app.db.snapshot import SnapshotStore
+from app.db.memory_store import MemoryStore
+from app.utils.key_filter import ApiKeyFilter
+from app.utils.generation import GenerationTracker
+from app.utils.response_cache import CodedETagMiddleware
+from app.config.settings import API_PREFIX, CORS_ORIGINS, GZIP_MINIMUM_SIZE, RUN_MIGRATIONS_ON_STARTUP
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+MIGRATION_RETRY_SECONDS = 10
+
+def run_startup_tasks(app: FastAPI):
+    """
+    Run migrations off the startup path, so the worker accepts requests
+    immediately, then start the API key filter and the scraper. Both wait for
+    the migrations: the filter needs keys migrated to hashes, and scrapes need
+    the backfills and the article_key index. Readiness is reported by /health/ready.
+    """
+    if RUN_MIGRATIONS_ON_STARTUP:
+        from app.db.migrations import run_migrations
+        while True:
+            try:
+                run_migrations()
+                break
+            except Exception as e:
+                app.state.startup_status = f"migrations failed: {e}"
+                logger.error(f"Startup migrations failed, retrying in {MIGRATION_RETRY_SECONDS}s: {e}")
+                time.sleep(MIGRATION_RETRY_SECONDS)
+
+    threading.Thread(target=ApiKeyFilter().run_forever, name="key-filter", daemon=True).start()
+    app.state.startup_status = "ok"
+    # The scheduler pulls in APScheduler and the scraper stack, so import it here
+    from app.utils.scheduler import start_scheduler
+    app.state.scheduler = start_scheduler()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup logic
     logger.info("Starting up application...")
-    # Create database indexes
-    db = MongoDB()
-    db.create_indexes()
-    logger.info("Database indexes created")
-    
-    # Start background scheduler
-    scheduler = start_scheduler()
-    app.state.scheduler = scheduler
-    
-    # Initial scrape to populate the database
-    scraper = NewsFeedScraper()
-    scraper.scrape_and_store()
+    app.state.startup_status = "starting"
+    # Map the last snapshot so the worker can serve stale reads if Mongo is unreachable
+    snapshot = SnapshotStore().current()
+    if snapshot:
+        logger.info(f"Snapshot generation {snapshot.generation} available for fallback reads")
+    # Rebuild the in-memory hot window whenever a new scrape generation shows up
+    GenerationTracker().add_listener(MemoryStore().refresh)
+    # Start the first generation poll now rather than on the first request
+    GenerationTracker().current()
+    threading.Thread(target=run_startup_tasks, args=(app,), name="startup", daemon=True).start()
     
     yield  # This is where the app runs
     
@@ -61,9 +89,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress cold responses on the fly; hot news pages arrive already encoded and are passed through
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=6)
+# Each content coding of a body gets its own strong ETag
+app.add_middleware(CodedETagMiddleware)
+
 # Include API routers
 app.include_router(news.router, prefix=API_PREFIX)
 app.include_router(auth.router, prefix=f"{API_PREFIX}/auth")
+app.include_router(health.router)
 
 @app.get("/", include_in_schema=False)
 async def root():
@@ -83,4 +117,5 @@ async def manifest():
     })
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,6 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
+from app.config.settings import API_KEY_HASH_SECRET, API_KEY_PREFIX_LENGTH
+import hashlib
+import hmac
 import secrets
 import string
 
@@ -9,6 +12,13 @@ def generate_api_key(length=32) -> str:
     alphabet = string.ascii_letters + string.digits
     return ''.join(secrets.choice(alphabet) for _ in range(length))
 
+def hash_api_key(key: str) -> str:
+    """Keyed hash stored in place of the API key."""
+    return hmac.new(API_KEY_HASH_SECRET.encode(), key.encode(), hashlib.sha256).hexdigest()
+
+def api_key_prefix(key: str) -> str:
+    return key[:API_KEY_PREFIX_LENGTH]
+
 class RateLimitTier(BaseModel):
     name: str
     requests_per_day: int
@@ -16,30 +26,15 @@ class RateLimitTier(BaseModel):
     max_results_per_request: int
 
 class ApiKey(BaseModel):
-    key: str = Field(default_factory=lambda: generate_api_key())
+    # Only the hash and a short prefix are stored; the key itself is shown once at creation
+    key_hash: str
+    key_prefix: str
     user_email: str
     user_name: str
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     last_used: Optional[datetime] = None
     is_active: bool = True
     tier: str = "free"  # free, basic, premium, etc.
     
-    # Usage tracking
+    # Usage tracking, per-period counts live in the api_usage collection
     total_requests: int = 0
-    daily_requests: Dict[str, int] = {}  # Format: {"YYYY-MM-DD": count}
-    
-    def update_usage(self):
-        """Update API key usage statistics."""
-        today = datetime.now().strftime("%Y-%m-%d")
-        self.last_used = datetime.now()
-        self.total_requests += 1
-        
-        if today in self.daily_requests:
-            self.daily_requests[today] += 1
-        else:
-            self.daily_requests[today] = 1
-    
-    def reset_daily_usage(self):
-        """Reset daily usage count."""
-        today = datetime.now().strftime("%Y-%m-%d")
-        self.daily_requests[today] = 0
@@ -0,0 +1,318 @@
+import asyncio
+import datetime
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from zoneinfo import ZoneInfo
+import httpx
+from bs4 import BeautifulSoup
+from pymongo import ReplaceOne
+from pymongo.errors import PyMongoError
+from app.config.settings import (
+    ENRICHMENT_CONCURRENCY, ENRICHMENT_PER_DOMAIN, ENRICHMENT_TIMEOUT, ENRICHMENT_BUDGET, ENRICHMENT_BATCH_SIZE,
+    ENRICHMENT_MAX_PAGE_BYTES, ENRICHMENT_MAX_BODY_CHARS, ENRICHMENT_RETRY_SECONDS, ENRICHMENT_MAX_ATTEMPTS,
+    GOOGLE_SEARCH_URL, NEWS_FEED_USER_AGENT, NEWS_FEED_TIMEZONE
+)
+from app.db.mongodb import MongoDB
+from app.utils.scrape_metrics import ScrapeMetrics
+
+logger = logging.getLogger(__name__)
+
+# Snippet the feed parser falls back to when an article has no summary
+PLACEHOLDER_PREFIX = "Latest financial news update related to"
+# Length of the snippet taken from the body to replace that placeholder
+SNIPPET_LENGTH = 300
+# Pages remembered in process before going to the Mongo cache
+LRU_SIZE = 1024
+# Fields an enrichment changes in API responses; passes that set none of them publish nothing
+VISIBLE_FIELDS = {"body", "content", "source_published_at"}
+# Responses that will not change on a retry
+PERMANENT_STATUS = {404, 410}
+
+PUBLISHED_META = [
+    {"property": "article:published_time"},
+    {"itemprop": "datePublished"},
+    {"name": "pubdate"},
+    {"name": "publishdate"},
+    {"name": "publish-date"},
+    {"name": "date"},
+]
+
+def _parse_datetime(value, default_tz):
+    try:
+        parsed = datetime.datetime.fromisoformat(value.strip())
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=default_tz)
+    return parsed.astimezone(datetime.timezone.utc)
+
+def _json_ld_articles(soup):
+    """NewsArticle-like objects from JSON-LD blocks, including @graph lists."""
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        stack = data if isinstance(data, list) else [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                stack.extend(item.get("@graph", []))
+                if "articleBody" in item or "datePublished" in item:
+                    yield item
+
+def extract_article(html, default_tz):
+    """
+    Main body text and publication time of an article page. Either may be None.
+    """
+    soup = BeautifulSoup(html, "lxml")
+    body = None
+    published_at = None
+    for item in _json_ld_articles(soup):
+        if body is None and isinstance(item.get("articleBody"), str) and item["articleBody"].strip():
+            body = item["articleBody"].strip()
+        if published_at is None and item.get("datePublished"):
+            published_at = _parse_datetime(item["datePublished"], default_tz)
+
+    if published_at is None:
+        for attrs in PUBLISHED_META:
+            meta = soup.find("meta", attrs=attrs)
+            if meta and meta.get("content"):
+                published_at = _parse_datetime(meta["content"], default_tz)
+                if published_at:
+                    break
+    if published_at is None:
+        time_tag = soup.find("time", datetime=True)
+        if time_tag:
+            published_at = _parse_datetime(time_tag["datetime"], default_tz)
+
+    if body is None:
+        for tag in soup(["script", "style", "nav", "header", "footer", "aside", "form"]):
+            tag.decompose()
+        # Paragraphs of the <article> if there is one, otherwise of the container holding the most text
+        containers = soup.find_all("article") or [p.parent for p in soup.find_all("p")]
+        best, best_length = None, 0
+        for container in containers:
+            length = sum(len(p.get_text(strip=True)) for p in container.find_all("p", recursive=container.name == "article"))
+            if length > best_length:
+                best, best_length = container, length
+        if best is not None:
+            paragraphs = [p.get_text(" ", strip=True) for p in best.find_all("p", recursive=best.name == "article")]
+            body = "\n\n".join(text for text in paragraphs if len(text) > 40) or None
+
+    if body:
+        body = body[:ENRICHMENT_MAX_BODY_CHARS]
+    return body, published_at
+
+def _fetchable(url):
+    # Articles without a link get a search URL from the parser, which is not worth fetching
+    return bool(url) and url.startswith("http") and not url.startswith(GOOGLE_SEARCH_URL)
+
+class PageCache:
+    """
+    Enrichment results by URL: an in-process LRU in front of the article_pages collection,
+    so a page is fetched at most once however many articles link to it. Transient
+    failures are kept with a `retry_after` and fetched again once it has passed.
+    """
+
+    def __init__(self):
+        self.collection = MongoDB().db["article_pages"]
+        self.memory = OrderedDict()
+
+    def get_many(self, urls):
+        found = {}
+        missing = []
+        for url in urls:
+            if url in self.memory:
+                self.memory.move_to_end(url)
+                found[url] = self.memory[url]
+            else:
+                missing.append(url)
+        if missing:
+            for page in self.collection.find({"_id": {"$in": missing}}):
+                found[page["_id"]] = page
+                self._remember(page)
+        return found
+
+    def put_many(self, pages):
+        if not pages:
+            return
+        self.collection.bulk_write(
+            [ReplaceOne({"_id": page["_id"]}, page, upsert=True) for page in pages],
+            ordered=False
+        )
+        for page in pages:
+            self._remember(page)
+
+    def _remember(self, page):
+        self.memory[page["_id"]] = page
+        self.memory.move_to_end(page["_id"])
+        if len(self.memory) > LRU_SIZE:
+            self.memory.popitem(last=False)
+
+class ArticleEnricher:
+    """
+    Fetches linked article pages after a scrape is published and adds `body`,
+    `source_published_at` and a better `content` snippet to the archived articles.
+    Passes run in a background thread, one at a time; a request made during a
+    pass queues one more pass.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ArticleEnricher, cls).__new__(cls)
+            cls._instance.db = MongoDB()
+            cls._instance.cache = PageCache()
+            cls._instance.feed_timezone = ZoneInfo(NEWS_FEED_TIMEZONE)
+            cls._instance.lock = threading.Lock()
+            cls._instance.running = False
+            cls._instance.pending = False
+        return cls._instance
+
+    def request(self, on_enriched=None):
+        """Start an enrichment pass in the background; `on_enriched()` runs after a pass that changed articles."""
+        with self.lock:
+            if self.running:
+                self.pending = True
+                return
+            self.running = True
+        threading.Thread(target=self._run, args=(on_enriched,), name="enrichment", daemon=True).start()
+
+    def _run(self, on_enriched):
+        while True:
+            try:
+                if self.enrich_pending() and on_enriched:
+                    on_enriched()
+            except PyMongoError as e:
+                logger.error(f"Enrichment pass failed: {e}")
+            except Exception as e:
+                logger.exception(f"Unexpected enrichment error: {e}")
+            with self.lock:
+                if not self.pending:
+                    self.running = False
+                    return
+                self.pending = False
+
+    def enrich_pending(self):
+        """
+        Run one pass over the newest unenriched articles. Returns the number of
+        articles whose served fields changed, so callers publish only then.
+        """
+        started = time.monotonic()
+        articles = self.db.get_news_to_enrich(ENRICHMENT_BATCH_SIZE)
+        if not articles:
+            return 0
+        urls = list(dict.fromkeys(article["url"] for article in articles if _fetchable(article.get("url"))))
+        now = datetime.datetime.now(datetime.timezone.utc)
+        pages = self.cache.get_many(urls)
+        # Transient failures whose wait is over are fetched again
+        retries = {url: page for url, page in pages.items() if page.get("retry_after") and page["retry_after"] <= now}
+        for url in retries:
+            del pages[url]
+        cached = len(pages)
+        fetched = asyncio.run(self.fetch_pages([url for url in urls if url not in pages]))
+        for url, page in fetched.items():
+            if page.get("error") and not page.get("permanent"):
+                page["attempts"] = retries.get(url, {}).get("attempts", 0) + 1
+                if page["attempts"] < ENRICHMENT_MAX_ATTEMPTS:
+                    page["retry_after"] = now + datetime.timedelta(seconds=ENRICHMENT_RETRY_SECONDS * page["attempts"])
+                else:
+                    page["permanent"] = True
+        self.cache.put_many(list(fetched.values()))
+        pages.update(fetched)
+
+        updates = []
+        for article in articles:
+            url = article.get("url", "")
+            if url in urls and url not in pages:
+                continue  # ran out of budget, try again next pass
+            if url in urls and pages[url].get("retry_after"):
+                # Failed for now; kept out of passes until the page is due again
+                updates.append((article["_id"], {"enrich_retry_after": pages[url]["retry_after"]}))
+                continue
+            fields = {"enriched_at": now}
+            page = pages.get(url)
+            if page and page.get("body"):
+                fields["body"] = page["body"]
+                if article.get("content", "").startswith(PLACEHOLDER_PREFIX):
+                    fields["content"] = page["body"][:SNIPPET_LENGTH]
+            if page and page.get("published_at"):
+                fields["source_published_at"] = page["published_at"]
+            updates.append((article["_id"], fields))
+        self.db.save_enrichment(updates)
+
+        enriched = sum(1 for _, fields in updates if "body" in fields)
+        changed = sum(1 for _, fields in updates if VISIBLE_FIELDS.intersection(fields))
+        stats = {
+            "articles": len(articles),
+            "updated": len(updates),
+            "changed": changed,
+            "with_body": enriched,
+            "cached_pages": cached,
+            "fetched_pages": len(fetched),
+            "failed_pages": sum(1 for page in fetched.values() if page.get("error")),
+            "retry_pages": sum(1 for page in fetched.values() if page.get("retry_after")),
+            "seconds": round(time.monotonic() - started, 2)
+        }
+        ScrapeMetrics().record_enrichment(stats)
+        logger.info(f"Enrichment pass: {stats}")
+        return changed
+
+    async def fetch_pages(self, urls):
+        """
+        Fetch pages concurrently within the time budget, at most ENRICHMENT_PER_DOMAIN
+        at a time per site. Pages that did not finish in time are left out.
+        """
+        if not urls:
+            return {}
+        domains = {}
+        limits = httpx.Limits(max_connections=ENRICHMENT_CONCURRENCY, max_keepalive_connections=ENRICHMENT_CONCURRENCY)
+        async with httpx.AsyncClient(
+            limits=limits, timeout=ENRICHMENT_TIMEOUT, follow_redirects=True,
+            headers={"User-Agent": NEWS_FEED_USER_AGENT}
+        ) as client:
+            tasks = {}
+            for url in urls:
+                semaphore = domains.setdefault(urlsplit(url).netloc, asyncio.Semaphore(ENRICHMENT_PER_DOMAIN))
+                tasks[asyncio.create_task(self.fetch_page(client, semaphore, url))] = url
+            done, pending = await asyncio.wait(tasks, timeout=ENRICHMENT_BUDGET)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+                logger.warning(f"Enrichment budget of {ENRICHMENT_BUDGET}s ran out with {len(pending)} pages left")
+        return {tasks[task]: task.result() for task in done}
+
+    async def fetch_page(self, client, semaphore, url):
+        """
+        Fetch and parse one page. Failures are recorded in the page rather than
+        raised; `permanent` marks the ones a retry would not fix.
+        """
+        page = {"_id": url, "fetched_at": datetime.datetime.now(datetime.timezone.utc)}
+        try:
+            async with semaphore:
+                async with client.stream("GET", url) as response:
+                    if response.status_code in PERMANENT_STATUS:
+                        return {**page, "error": f"HTTP {response.status_code}", "permanent": True}
+                    response.raise_for_status()
+                    if "html" not in response.headers.get("content-type", "html"):
+                        return {**page, "error": "not html", "permanent": True}
+                    content = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        content += chunk
+                        if len(content) >= ENRICHMENT_MAX_PAGE_BYTES:
+                            break
+                    html = content.decode(response.encoding or "utf-8", errors="replace")
+            # Parsing is CPU bound, keep it off the event loop
+            body, published_at = await asyncio.to_thread(extract_article, html, self.feed_timezone)
+        except Exception as e:
+            # Network errors, but also InvalidURL (not an HTTPError) and parser failures
+            return {**page, "error": f"{e.__class__.__name__}: {e}"[:200]}
+        return {**page, "body": body, "published_at": published_at}
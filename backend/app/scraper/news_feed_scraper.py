@@ -1,11 +1,20 @@
 import requests
-from bs4 import BeautifulSoup
 import datetime
-import json
 import logging
 import re
-from app.config.settings import NEWS_FEED_URL, GOOGLE_SEARCH_URL, NEWS_FEED_USER_AGENT
+from zoneinfo import ZoneInfo
+from pymongo.errors import PyMongoError
+from app.config.settings import (
+    NEWS_FEED_URL, NEWS_FEED_USER_AGENT, NEWS_FEED_MAX_BYTES, NEWS_FEED_TIMEZONE, SNAPSHOT_PATH, SNAPSHOT_MAX_ARTICLES, ENRICHMENT_ENABLED
+)
 from app.db.mongodb import MongoDB
+from app.db.snapshot import write_snapshot
+from app.scraper.pipeline import (
+    Pipeline, FetchStage, ExtractStage, NormalizeTimestampsStage, CategorizeStage, DedupeStage, StoreStage
+)
+from app.utils.fieldsets import DEFAULT_PROJECTION
+from app.utils.generation import GenerationTracker
+from app.utils.scrape_metrics import ScrapeMetrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -14,6 +23,7 @@ logger = logging.getLogger(__name__)
 class NewsFeedScraper:
     def __init__(self):
         self.base_url = NEWS_FEED_URL
+        self.feed_timezone = ZoneInfo(NEWS_FEED_TIMEZONE)
         self.db = MongoDB()
     
     def fetch_page(self):
@@ -22,11 +32,23 @@ class NewsFeedScraper:
                 "User-Agent": NEWS_FEED_USER_AGENT
             }
             logger.info(f"Fetching {self.base_url}")
-            response = requests.get(self.base_url, headers=headers, timeout=15)
-            response.raise_for_status()
-            logger.info(f"Successfully fetched page, content length: {len(response.text)}")
-            return response.text
+            with requests.get(self.base_url, headers=headers, timeout=15, stream=True) as response:
+                content = bytearray()
+                try:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        content += chunk
+                        if len(content) >= NEWS_FEED_MAX_BYTES:
+                            logger.warning(f"Feed page larger than {NEWS_FEED_MAX_BYTES} bytes, truncating")
+                            break
+                finally:
+                    ScrapeMetrics().record_request(response.status_code, len(content))
+                text = content.decode(response.encoding or "utf-8", errors="replace")
+            logger.info(f"Successfully fetched page, content length: {len(text)}")
+            return text
         except requests.RequestException as e:
+            if e.response is None:
+                ScrapeMetrics().record_request(None)
             logger.error(f"Error fetching page: {e}")
             return None
     
@@ -54,8 +76,12 @@ class NewsFeedScraper:
         return "Financial News"
     
     def parse_timestamp(self, timestamp_text):
+        """
+        Returns the display text and a timezone-aware UTC publication datetime.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
         if not timestamp_text:
-            return "Unknown", datetime.datetime.now().isoformat()
+            return "Unknown", now
             
         formats = [
             "%I:%M %p, %d %b %Y",
@@ -67,7 +93,6 @@ class NewsFeedScraper:
         if relative_time_match:
             amount, unit = relative_time_match.groups()
             amount = float(amount)
-            now = datetime.datetime.now()
             
             if 'hour' in unit:
                 delta = datetime.timedelta(hours=amount)
@@ -78,155 +103,87 @@ class NewsFeedScraper:
             else:
                 delta = datetime.timedelta(0)
                 
-            timestamp = now - delta
-            return timestamp_text, timestamp.isoformat()
+            return timestamp_text, now - delta
         
         for fmt in formats:
             try:
                 dt = datetime.datetime.strptime(timestamp_text, fmt)
-                return timestamp_text, dt.isoformat()
+                # Absolute feed timestamps are local to the feed
+                dt = dt.replace(tzinfo=self.feed_timezone)
+                return timestamp_text, dt.astimezone(datetime.timezone.utc)
             except ValueError:
                 continue
                 
-        return timestamp_text, datetime.datetime.now().isoformat()
+        return timestamp_text, now
     
     def parse_news(self, html_content):
+        """
+        Parse a feed page into articles, running the parsing stages of the pipeline in order
+        """
         if not html_content:
             return []
-        
-        soup = BeautifulSoup(html_content, 'lxml')
-        news_items = []
-        
-        try:
-            headings = soup.find_all(['h1', 'h2', 'h3'])
-            logger.info(f"Found {len(headings)} headings")
-            unique_titles = set()
-            for i, heading in enumerate(headings):
-                title_text = heading.get_text(strip=True)
-                if not title_text or len(title_text) < 10 or title_text in unique_titles:
-                    continue
-                unique_titles.add(title_text)
-                news_item = {'title': title_text}
-                parent = heading
-                for _ in range(5):
-                    if parent.parent and parent.parent.name != 'body':
-                        parent = parent.parent
-                        if len(parent.find_all(['p', 'a', 'span', 'div'])) > 3:
-                            break
-                content = ""
-                content_elem = heading.find_next('p')
-                if content_elem and len(content_elem.get_text(strip=True)) > 15:
-                    content = content_elem.get_text(strip=True)
-                else:
-                    for elem in parent.find_all(['div', 'span']):
-                        elem_text = elem.get_text(strip=True)
-                        if elem_text and len(elem_text) > 20 and elem_text != title_text and 'trending' not in elem_text.lower():
-                            content = elem_text
-                            break
-                if not content or len(content) < 20:
-                    content = f"Latest financial news update related to {title_text}"
-                news_item['content'] = content
-                url = None
-                links = parent.find_all('a', href=True)
-                for link in links:
-                    href = link['href']
-                    if not href.startswith('#') and not href.startswith('/') and not href.startswith('https://pulse.zerodha.com'):
-                        url = href
-                        break
-                if not url:
-                    for link in links:
-                        href = link['href']
-                        if href.startswith('http') and 'zerodha.com' not in href:
-                            url = href
-                            break
-                if not url:
-                    url = f"{GOOGLE_SEARCH_URL}{'+'.join(title_text.split()[:7])}"
-                news_item['url'] = url
-                source_name = None
-                text_nodes = list(parent.stripped_strings)
-                for idx, text in enumerate(text_nodes):
-                    if re.match(r'\d{1,2}:\d{2}\s*[AP]M,? \d{1,2} [A-Za-z]{3} \d{4}', text) or re.match(r'\d+(\.\d+)?\s*(hours?|minutes?|days?)\s+ago', text):
-                        for lookahead in text_nodes[idx+1:idx+4]:
-                            if '—' in lookahead:
-                                parts = lookahead.split('—')
-                                if len(parts) > 1:
-                                    source_name = parts[-1].strip()
-                                    break
-                        if source_name:
-                            break
-                if not source_name:
-                    for text in text_nodes:
-                        if '—' in text:
-                            parts = text.split('—')
-                            if len(parts) > 1:
-                                source_name = parts[-1].strip()
-                                break
-                if not source_name:
-                    source_name = self.detect_source_from_url(url)
-                news_item['source'] = source_name
-                timestamp_text = None
-                time_patterns = [
-                    r'\d{1,2}:\d{2}\s*[AP]M,? \d{1,2} [A-Za-z]{3} \d{4}',
-                    r'\d+\s*minutes?\s*ago',
-                    r'\d+(\.\d+)?\s*hours?\s*ago'
-                ]
-                for pattern in time_patterns:
-                    matches = [t for t in text_nodes if re.search(pattern, t)]
-                    if matches:
-                        timestamp_text = re.search(pattern, matches[0]).group(0)
-                        break
-                if not timestamp_text:
-                    minutes_ago = 5 + (i * 3)
-                    if minutes_ago > 59:
-                        hours_ago = minutes_ago // 60
-                        timestamp_text = f"{hours_ago} hour{'s' if hours_ago > 1 else ''} ago"
-                    else:
-                        timestamp_text = f"{minutes_ago} minutes ago"
-                news_item['timestamp'], news_item['timestamp_iso'] = self.parse_timestamp(timestamp_text)
-                all_text = f"{title_text} {content}".lower()
-                categories = []
-                category_keywords = {
-                    'stocks': ['stocks', 'share', 'equity', 'nifty', 'sensex', 'bse', 'nse', 'shareholder', 'price'],
-                    'market': ['market', 'trading', 'rally', 'bearish', 'bullish', 'index', 'indices', 'trade', 'rupee', 'dollar', 'currency', 'forex', 'exchange rate'],
-                    'economy': ['economy', 'gdp', 'inflation', 'growth', 'fiscal', 'economic', 'rupee', 'dollar', 'currency'],
-                    'banking': ['bank', 'loan', 'credit', 'deposit', 'fintech', 'pnb', 'sbi', 'rbl'],
-                    'tech': ['tech', 'technology', 'it', 'software', 'digital', 'ai'],
-                    'policy': ['policy', 'rbi', 'sebi', 'regulation', 'government', 'ministry'],
-                    'corporate': ['results', 'earnings', 'revenue', 'profit', 'loss', 'dividend', 'quarterly', 'q4']
-                }
-                for category, keywords in category_keywords.items():
-                    if any(keyword in all_text for keyword in keywords):
-                        categories.append(category)
-                if categories:
-                    news_item['categories'] = categories
-                else:
-                    news_item['categories'] = ['finance']
-                news_items.append(news_item)
-            logger.info(f"Successfully extracted {len(news_items)} news items")
-        except Exception as e:
-            logger.error(f"Error parsing news: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+        news_items = list(Pipeline(self.parse_stages()).stream([html_content]))
+        logger.info(f"Successfully extracted {len(news_items)} news items")
         return news_items
+
+    def parse_stages(self):
+        return [
+            ExtractStage(self.detect_source_from_url),
+            NormalizeTimestampsStage(self.parse_timestamp),
+            CategorizeStage(),
+            DedupeStage()
+        ]
+    
+    def write_snapshot(self, state):
+        """
+        Save the newest articles of a published generation for warm starts and outages
+        """
+        if not SNAPSHOT_PATH:
+            return
+        try:
+            articles = self.db.get_all_news(limit=SNAPSHOT_MAX_ARTICLES, projection=DEFAULT_PROJECTION)
+            write_snapshot(articles, state["generation"], state["published_at"])
+            logger.info(f"Wrote snapshot of {len(articles)} articles to {SNAPSHOT_PATH}")
+        except (PyMongoError, OSError) as e:
+            logger.error(f"Error writing snapshot: {e}")
     
+    def publish(self):
+        """
+        Bump the scrape generation so caches and the memory store pick up changed articles
+        """
+        state = self.db.publish_generation()
+        GenerationTracker().update(state)
+        logger.info(f"Published scrape generation {state['generation']}")
+        self.write_snapshot(state)
+        return state
+
     def scrape_and_store(self):
+        """
+        Run one scrape cycle through the staged pipeline. Returns the outcome for the scheduler:
+        {"status": "new" | "unchanged" | "failed", "inserted": count}
+        """
         logger.info("Starting scraping process for news feed")
-        html_content = self.fetch_page()
-        
-        if html_content:
-            news_items = self.parse_news(html_content)
-            logger.info(f"Found {len(news_items)} news items")
-            
-            if news_items:
-                try:
-                    self.db.collection.delete_many({})
-                    logger.info("Cleared existing news items from database")
-                except Exception as e:
-                    logger.error(f"Error clearing database: {e}")
-                
-                self.db.insert_news(news_items)
-                logger.info("News items stored in database")
-            else:
-                logger.warning("No news items found to store")
-        else:
+        fetch = FetchStage(self.fetch_page)
+        store = StoreStage(self.db.archive_news, on_archived=ScrapeMetrics().record_freshness)
+        stages = Pipeline([fetch] + self.parse_stages() + [store]).run()
+        ScrapeMetrics().record_pipeline(stages)
+        logger.info(f"Archived {store.archived} new news items")
+
+        if fetch.metrics["errors"]:
             logger.error("Failed to fetch page content")
+            return {"status": "failed", "inserted": 0}
+        if store.archived:
+            # Publish whatever was stored, even if a later batch failed
+            self.publish()
+            if ENRICHMENT_ENABLED:
+                # Imported here so the fetch pool is only loaded when enrichment is on
+                from app.scraper.enrichment import ArticleEnricher
+                ArticleEnricher().request(on_enriched=self.publish)
+            return {"status": "new", "inserted": store.archived}
+        if store.metrics["errors"]:
+            # Failed batches, or any other error that stopped the store stage; back off rather than slow down
+            logger.error(f"Store stage failed: {store.metrics['last_error']}")
+            return {"status": "failed", "inserted": 0}
+        if not store.metrics["items_in"]:
+            logger.warning("No news items found to store")
+        return {"status": "unchanged", "inserted": 0}
@@ -0,0 +1,326 @@
+import logging
+import queue
+import re
+import threading
+import time
+from bs4 import BeautifulSoup
+from pymongo.errors import PyMongoError
+from app.config.settings import GOOGLE_SEARCH_URL, PIPELINE_QUEUE_SIZE, STORE_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_PATTERNS = [
+    r'\d{1,2}:\d{2}\s*[AP]M,? \d{1,2} [A-Za-z]{3} \d{4}',
+    r'\d+\s*minutes?\s*ago',
+    r'\d+(\.\d+)?\s*hours?\s*ago'
+]
+
+CATEGORY_KEYWORDS = {
+    'stocks': ['stocks', 'share', 'equity', 'nifty', 'sensex', 'bse', 'nse', 'shareholder', 'price'],
+    'market': ['market', 'trading', 'rally', 'bearish', 'bullish', 'index', 'indices', 'trade', 'rupee', 'dollar', 'currency', 'forex', 'exchange rate'],
+    'economy': ['economy', 'gdp', 'inflation', 'growth', 'fiscal', 'economic', 'rupee', 'dollar', 'currency'],
+    'banking': ['bank', 'loan', 'credit', 'deposit', 'fintech', 'pnb', 'sbi', 'rbl'],
+    'tech': ['tech', 'technology', 'it', 'software', 'digital', 'ai'],
+    'policy': ['policy', 'rbi', 'sebi', 'regulation', 'government', 'ministry'],
+    'corporate': ['results', 'earnings', 'revenue', 'profit', 'loss', 'dividend', 'quarterly', 'q4']
+}
+
+class Stage:
+    """
+    One step of the scrape pipeline. `process(item)` yields zero or more output
+    items and `flush()` yields anything held back once the input is exhausted.
+    An exception drops the current item and is counted, the stage keeps going.
+    """
+    name = "stage"
+
+    def __init__(self):
+        self.metrics = {"items_in": 0, "items_out": 0, "errors": 0, "seconds": 0.0, "last_error": None}
+
+    def process(self, item):
+        yield item
+
+    def flush(self):
+        return ()
+
+    def run(self, items):
+        """Generator over this stage's output. Timing excludes time spent downstream."""
+        for item in items:
+            self.metrics["items_in"] += 1
+            yield from self._timed(lambda: self.process(item))
+        yield from self._timed(self.flush)
+
+    def _timed(self, produce):
+        started = time.perf_counter()
+        try:
+            outputs = iter(produce())
+            while True:
+                try:
+                    output = next(outputs)
+                except StopIteration:
+                    return
+                self.metrics["items_out"] += 1
+                self.metrics["seconds"] += time.perf_counter() - started
+                yield output
+                started = time.perf_counter()
+        except Exception as e:
+            self.metrics["errors"] += 1
+            self.metrics["last_error"] = f"{e.__class__.__name__}: {e}"[:200]
+            logger.error(f"Pipeline stage {self.name} failed: {e}")
+        finally:
+            self.metrics["seconds"] += time.perf_counter() - started
+
+    def report(self):
+        return {"stage": self.name, **self.metrics, "seconds": round(self.metrics["seconds"], 4)}
+
+class FetchError(Exception):
+    pass
+
+class FetchStage(Stage):
+    """Source stage: ignores its input and yields the feed page."""
+    name = "fetch"
+
+    def __init__(self, fetch):
+        super().__init__()
+        self.fetch = fetch
+
+    def process(self, item):
+        html = self.fetch()
+        if html is None:
+            raise FetchError("no page content")
+        yield html
+
+class ExtractStage(Stage):
+    """Yields one raw article per headline, without timestamps or categories."""
+    name = "extract"
+
+    def __init__(self, detect_source):
+        super().__init__()
+        self.detect_source = detect_source
+
+    def process(self, html):
+        soup = BeautifulSoup(html, 'lxml')
+        headings = soup.find_all(['h1', 'h2', 'h3'])
+        logger.info(f"Found {len(headings)} headings")
+        for i, heading in enumerate(headings):
+            try:
+                item = self.extract(i, heading)
+            except Exception as e:
+                # One malformed headline should not cost the rest of the page
+                self.metrics["errors"] += 1
+                self.metrics["last_error"] = f"{e.__class__.__name__}: {e}"[:200]
+                continue
+            if item is not None:
+                yield item
+
+    def extract(self, i, heading):
+        title_text = heading.get_text(strip=True)
+        if not title_text or len(title_text) < 10:
+            return None
+        news_item = {'title': title_text}
+        parent = heading
+        for _ in range(5):
+            if parent.parent and parent.parent.name != 'body':
+                parent = parent.parent
+                if len(parent.find_all(['p', 'a', 'span', 'div'])) > 3:
+                    break
+        content = ""
+        content_elem = heading.find_next('p')
+        if content_elem and len(content_elem.get_text(strip=True)) > 15:
+            content = content_elem.get_text(strip=True)
+        else:
+            for elem in parent.find_all(['div', 'span']):
+                elem_text = elem.get_text(strip=True)
+                if elem_text and len(elem_text) > 20 and elem_text != title_text and 'trending' not in elem_text.lower():
+                    content = elem_text
+                    break
+        if not content or len(content) < 20:
+            content = f"Latest financial news update related to {title_text}"
+        news_item['content'] = content
+        url = None
+        links = parent.find_all('a', href=True)
+        for link in links:
+            href = link['href']
+            if not href.startswith('#') and not href.startswith('/') and not href.startswith('https://pulse.zerodha.com'):
+                url = href
+                break
+        if not url:
+            for link in links:
+                href = link['href']
+                if href.startswith('http') and 'zerodha.com' not in href:
+                    url = href
+                    break
+        if not url:
+            url = f"{GOOGLE_SEARCH_URL}{'+'.join(title_text.split()[:7])}"
+        news_item['url'] = url
+        source_name = None
+        text_nodes = list(parent.stripped_strings)
+        for idx, text in enumerate(text_nodes):
+            if re.match(r'\d{1,2}:\d{2}\s*[AP]M,? \d{1,2} [A-Za-z]{3} \d{4}', text) or re.match(r'\d+(\.\d+)?\s*(hours?|minutes?|days?)\s+ago', text):
+                for lookahead in text_nodes[idx+1:idx+4]:
+                    if '—' in lookahead:
+                        parts = lookahead.split('—')
+                        if len(parts) > 1:
+                            source_name = parts[-1].strip()
+                            break
+                if source_name:
+                    break
+        if not source_name:
+            for text in text_nodes:
+                if '—' in text:
+                    parts = text.split('—')
+                    if len(parts) > 1:
+                        source_name = parts[-1].strip()
+                        break
+        if not source_name:
+            source_name = self.detect_source(url)
+        news_item['source'] = source_name
+        timestamp_text = None
+        for pattern in TIMESTAMP_PATTERNS:
+            matches = [t for t in text_nodes if re.search(pattern, t)]
+            if matches:
+                timestamp_text = re.search(pattern, matches[0]).group(0)
+                break
+        if not timestamp_text:
+            # No timestamp near the headline, assume feed order
+            minutes_ago = 5 + (i * 3)
+            if minutes_ago > 59:
+                hours_ago = minutes_ago // 60
+                timestamp_text = f"{hours_ago} hour{'s' if hours_ago > 1 else ''} ago"
+            else:
+                timestamp_text = f"{minutes_ago} minutes ago"
+        news_item['timestamp'] = timestamp_text
+        return news_item
+
+class NormalizeTimestampsStage(Stage):
+    """Turns the feed's timestamp text into published_at and timestamp_iso."""
+    name = "normalize"
+
+    def __init__(self, parse_timestamp):
+        super().__init__()
+        self.parse_timestamp = parse_timestamp
+
+    def process(self, item):
+        item['timestamp'], item['published_at'] = self.parse_timestamp(item['timestamp'])
+        item['timestamp_iso'] = item['published_at'].isoformat()
+        yield item
+
+class CategorizeStage(Stage):
+    """Tags articles by keywords in the title and content."""
+    name = "categorize"
+
+    def __init__(self, keywords=CATEGORY_KEYWORDS):
+        super().__init__()
+        self.keywords = keywords
+
+    def process(self, item):
+        all_text = f"{item['title']} {item['content']}".lower()
+        categories = [category for category, words in self.keywords.items() if any(word in all_text for word in words)]
+        item['categories'] = categories or ['finance']
+        yield item
+
+class DedupeStage(Stage):
+    """Drops repeated titles within one run; the archive dedupes across runs."""
+    name = "dedupe"
+
+    def __init__(self):
+        super().__init__()
+        self.seen = set()
+
+    def process(self, item):
+        if item['title'] not in self.seen:
+            self.seen.add(item['title'])
+            yield item
+
+class StoreStage(Stage):
+    """Archives articles in batches as they arrive and yields the newly archived ones."""
+    name = "store"
+
+    def __init__(self, archive, batch_size=STORE_BATCH_SIZE, on_archived=None):
+        super().__init__()
+        self.archive = archive
+        self.batch_size = batch_size
+        self.on_archived = on_archived
+        self.batch = []
+        self.archived = 0
+        self.failed_batches = 0
+
+    def process(self, item):
+        self.batch.append(item)
+        if len(self.batch) >= self.batch_size:
+            yield from self._write()
+
+    def flush(self):
+        if self.batch:
+            yield from self._write()
+
+    def _write(self):
+        batch, self.batch = self.batch, []
+        try:
+            archived = self.archive(batch)
+        except PyMongoError as e:
+            # Count the batch and keep storing the rest of the feed
+            self.failed_batches += 1
+            self.metrics["errors"] += 1
+            self.metrics["last_error"] = f"{e.__class__.__name__}: {e}"[:200]
+            logger.error(f"Error storing batch of {len(batch)} articles: {e}")
+            return
+        self.archived += len(archived)
+        if archived and self.on_archived:
+            self.on_archived(archived)
+        yield from archived
+
+_DONE = object()
+
+class Pipeline:
+    """
+    Chains stages. `run()` gives every stage its own thread, connected by
+    bounded queues so a slow stage holds back the ones before it; `stream()`
+    chains the same stages as plain generators in the calling thread.
+    """
+
+    def __init__(self, stages, queue_size=PIPELINE_QUEUE_SIZE):
+        self.stages = stages
+        self.queue_size = queue_size
+
+    def stream(self, items=(None,)):
+        for stage in self.stages:
+            items = stage.run(items)
+        return items
+
+    def run(self, items=(None,)):
+        """Run to completion, discarding the last stage's output. Returns per-stage metrics."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages[:-1]]
+        threads = []
+        for index, stage in enumerate(self.stages):
+            source = self._drain(queues[index - 1]) if index else iter(items)
+            sink = queues[index] if index < len(queues) else None
+            thread = threading.Thread(target=self._work, args=(stage, source, sink), name=f"pipeline-{stage.name}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        return self.report()
+
+    def report(self):
+        return [stage.report() for stage in self.stages]
+
+    @staticmethod
+    def _drain(source_queue):
+        while True:
+            item = source_queue.get()
+            if item is _DONE:
+                return
+            yield item
+
+    @staticmethod
+    def _work(stage, source, sink):
+        try:
+            for output in stage.run(source):
+                if sink is not None:
+                    sink.put(output)
+        finally:
+            # Keep upstream from blocking on a full queue if this stage stopped early
+            for _ in source:
+                pass
+            if sink is not None:
+                sink.put(_DONE)
@@ -1,7 +1,12 @@
 from fastapi import Request, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import APIKeyHeader
-from starlette.status import HTTP_403_FORBIDDEN, HTTP_429_TOO_MANY_REQUESTS
+from starlette.status import HTTP_403_FORBIDDEN, HTTP_429_TOO_MANY_REQUESTS, HTTP_503_SERVICE_UNAVAILABLE
+from pymongo.errors import PyMongoError
 from app.db.api_key_manager import ApiKeyManager
+from app.config.settings import BATCH_REQUEST_COST, OUTAGE_KEY_GRACE_SECONDS
+from app.utils.outage import database_down, report_database_failure
+from app.utils.key_filter import ApiKeyFilter
 from datetime import datetime, timedelta
 from typing import Dict, Optional
 import time
@@ -14,25 +19,50 @@ API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=False)
 # Format: {"api_key": {"count": 0, "reset_at": timestamp}}
 request_counts: Dict[str, Dict[str, any]] = {}
 
+# Keys validated recently, so they keep working while the database is unreachable
+# Format: {"api_key": {"tier": "free", "validated_at": timestamp}}
+validated_keys: Dict[str, Dict[str, any]] = {}
+
 # Rate limit configurations for different tiers
 RATE_LIMITS = {
     "free": {
         "requests_per_day": 100,
         "requests_per_minute": 10,
-        "max_results_per_request": 20
+        "max_results_per_request": 20,
+        "max_queries_per_batch": 10
     },
     "basic": {
         "requests_per_day": 1000,
         "requests_per_minute": 30,
-        "max_results_per_request": 50
+        "max_results_per_request": 50,
+        "max_queries_per_batch": 20
     },
     "premium": {
         "requests_per_day": 10000,
         "requests_per_minute": 60,
-        "max_results_per_request": 100
+        "max_results_per_request": 100,
+        "max_queries_per_batch": 50
     }
 }
 
+def get_outage_tier(api_key: str) -> str:
+    """Tier of a recently validated key, for use while the database is down."""
+    cached = validated_keys.get(api_key)
+    if not cached or time.time() - cached["validated_at"] > OUTAGE_KEY_GRACE_SECONDS:
+        raise HTTPException(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            detail="API key cannot be verified right now. Please retry shortly.",
+            headers={"Retry-After": "30"}
+        )
+    return cached["tier"]
+
+def remember_validated_key(api_key: str, tier: str):
+    now = time.time()
+    if len(validated_keys) > 100000:
+        for key in [k for k, v in validated_keys.items() if now - v["validated_at"] > OUTAGE_KEY_GRACE_SECONDS]:
+            del validated_keys[key]
+    validated_keys[api_key] = {"tier": tier, "validated_at": now}
+
 def get_api_key_or_error(api_key: str = Depends(API_KEY_HEADER)):
     """Validate API key and return it or raise an error."""
     if not api_key:
@@ -41,70 +71,114 @@ def get_api_key_or_error(api_key: str = Depends(API_KEY_HEADER)):
             detail="API key is missing. Add X-API-Key header to your request.",
         )
     
-    api_key_manager = ApiKeyManager()
-    if not api_key_manager.validate_api_key(api_key):
+    # Keys the filter has never seen are rejected without a database lookup
+    if api_key not in validated_keys and not ApiKeyFilter().might_contain(api_key):
         raise HTTPException(
             status_code=HTTP_403_FORBIDDEN,
             detail="Invalid or inactive API key",
         )
     
-    return api_key
-
-def check_rate_limit(api_key: str):
-    """Check if request is within rate limits."""
+    if database_down():
+        get_outage_tier(api_key)
+        return api_key
+    
     api_key_manager = ApiKeyManager()
-    key_data = api_key_manager.get_api_key(api_key)
+    try:
+        tier = api_key_manager.validate_api_key(api_key)
+    except PyMongoError:
+        report_database_failure()
+        get_outage_tier(api_key)
+        return api_key
     
-    if not key_data:
+    if not tier:
         raise HTTPException(
             status_code=HTTP_403_FORBIDDEN,
-            detail="Invalid API key",
-        )
-    
-    # Get rate limits for this tier
-    tier = key_data.tier
-    rate_limit = RATE_LIMITS.get(tier, RATE_LIMITS["free"])
-    
-    # Check daily limit
-    today = datetime.now().strftime("%Y-%m-%d")
-    daily_requests = key_data.daily_requests.get(today, 0)
-    
-    if daily_requests >= rate_limit["requests_per_day"]:
-        raise HTTPException(
-            status_code=HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Daily rate limit exceeded. Maximum {rate_limit['requests_per_day']} requests per day.",
-            headers={"Retry-After": "86400"}  # Retry after 24 hours
+            detail="Invalid or inactive API key",
         )
     
-    # Check per-minute limit
+    remember_validated_key(api_key, tier)
+    return api_key
+
+def validated_rate_limit(api_key: str) -> dict:
+    """Limits for the tier of a key get_api_key_or_error has just accepted, without another lookup."""
+    cached = validated_keys.get(api_key)
+    return RATE_LIMITS.get(cached["tier"] if cached else "free", RATE_LIMITS["free"])
+
+def check_minute_limit(api_key: str, rate_limit: dict, cost: int = 1):
+    """Check and count the per-minute limit, kept in memory per worker."""
     current_minute = int(time.time() / 60)
     minute_key = f"{api_key}:{current_minute}"
     
     if minute_key in request_counts:
-        if request_counts[minute_key]["count"] >= rate_limit["requests_per_minute"]:
+        if request_counts[minute_key]["count"] + cost > rate_limit["requests_per_minute"]:
             raise HTTPException(
                 status_code=HTTP_429_TOO_MANY_REQUESTS,
                 detail=f"Rate limit exceeded. Maximum {rate_limit['requests_per_minute']} requests per minute.",
                 headers={"Retry-After": "60"}
             )
-        request_counts[minute_key]["count"] += 1
+        request_counts[minute_key]["count"] += cost
     else:
         # Clean up old entries
         for key in list(request_counts.keys()):
             if ":" in key and int(key.split(":")[1]) < current_minute:
                 del request_counts[key]
         
-        request_counts[minute_key] = {"count": 1}
+        if cost > rate_limit["requests_per_minute"]:
+            raise HTTPException(
+                status_code=HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded. Maximum {rate_limit['requests_per_minute']} requests per minute.",
+                headers={"Retry-After": "60"}
+            )
+        request_counts[minute_key] = {"count": cost}
+
+def check_outage_rate_limit(api_key: str, cost: int = 1):
+    """Rate limiting while the database is down: only the in-memory per-minute limit applies."""
+    rate_limit = RATE_LIMITS.get(get_outage_tier(api_key), RATE_LIMITS["free"])
+    check_minute_limit(api_key, rate_limit, cost)
+    return rate_limit
+
+def check_rate_limit(api_key: str, cost: int = 1):
+    """
+    Check if request is within rate limits and charge `cost` requests against them.
+    Blocks on Mongo, so async callers run it in the threadpool.
+    """
+    if database_down():
+        return check_outage_rate_limit(api_key, cost)
+    
+    # The tier was read when get_api_key_or_error validated the key
+    rate_limit = validated_rate_limit(api_key)
+    
+    # Check per-minute limit first, it needs no database
+    check_minute_limit(api_key, rate_limit, cost)
     
-    # Update API key usage
-    api_key_manager.update_key_usage(api_key)
+    # Charge today's counter, which is also the daily limit check
+    try:
+        charged = ApiKeyManager().update_key_usage(api_key, count=cost, daily_limit=rate_limit["requests_per_day"])
+    except PyMongoError:
+        report_database_failure()
+        return rate_limit
     
-    # Return max results allowed for this tier
-    return rate_limit["max_results_per_request"]
+    if not charged:
+        raise HTTPException(
+            status_code=HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Daily rate limit exceeded. Maximum {rate_limit['requests_per_day']} requests per day.",
+            headers={"Retry-After": "86400"}  # Retry after 24 hours
+        )
+    
+    # Return the limits for this tier
+    return rate_limit
 
 async def rate_limit_middleware(request: Request, api_key: str = Depends(get_api_key_or_error)):
     """Middleware for API key validation and rate limiting."""
-    max_results = check_rate_limit(api_key)
-    request.state.max_results = max_results
+    rate_limit = await run_in_threadpool(check_rate_limit, api_key)
+    request.state.max_results = rate_limit["max_results_per_request"]
+    request.state.api_key = api_key
+    return api_key
+
+async def batch_rate_limit_middleware(request: Request, api_key: str = Depends(get_api_key_or_error)):
+    """Middleware for batch requests, charged once per batch rather than per sub-query."""
+    rate_limit = await run_in_threadpool(check_rate_limit, api_key, cost=BATCH_REQUEST_COST)
+    request.state.max_results = rate_limit["max_results_per_request"]
+    request.state.max_batch_queries = rate_limit["max_queries_per_batch"]
     request.state.api_key = api_key
     return api_key
@@ -0,0 +1,84 @@
+from typing import Literal, Optional
+from fastapi import HTTPException, Query
+from app.config.settings import SUMMARY_CONTENT_LENGTH
+
+# Fields clients may ask for with ?fields=
+ALLOWED_FIELDS = (
+    "_id", "title", "content", "url", "source", "categories", "timestamp", "timestamp_iso", "published_at", "ingested_at",
+    "body", "source_published_at", "enriched_at"
+)
+# Only returned when asked for by name; also kept out of the memory store and snapshots
+HEAVY_FIELDS = ("body",)
+# Bookkeeping fields that are never returned
+INTERNAL_FIELDS = ("article_key", "backfill_skipped", "enrich_retry_after")
+# Projection for full documents
+DEFAULT_PROJECTION = {field: 0 for field in HEAVY_FIELDS + INTERNAL_FIELDS}
+# Fields returned by view=summary, with content truncated to SUMMARY_CONTENT_LENGTH
+SUMMARY_FIELDS = ("_id", "title", "content", "url", "source", "timestamp", "published_at")
+
+class Fieldset:
+    """
+    A subset of article fields, applied as a Mongo projection or to documents
+    that are already in memory.
+    """
+    __slots__ = ("fields", "truncate")
+
+    def __init__(self, fields, truncate=None):
+        self.fields = tuple(fields)
+        self.truncate = truncate
+
+    @property
+    def key(self):
+        """Hashable identity, so each subset is cached separately."""
+        return (self.fields, self.truncate)
+
+    def including(self, *fields):
+        """Same subset plus `fields`, e.g. the keys a cursor needs."""
+        return Fieldset(self.fields + tuple(field for field in fields if field not in self.fields), self.truncate)
+
+    @property
+    def heavy(self):
+        """True when the subset needs fields that only Mongo holds."""
+        return any(field in HEAVY_FIELDS for field in self.fields)
+
+    def projection(self):
+        projection = {field: 1 for field in self.fields}
+        if "_id" not in self.fields:
+            projection["_id"] = 0
+        if self.truncate and "content" in self.fields:
+            # Truncate on the server so the full text never crosses the wire
+            projection["content"] = {"$substrCP": ["$content", 0, self.truncate]}
+        return projection
+
+    def apply(self, document):
+        projected = {field: document[field] for field in self.fields if field in document}
+        if self.truncate and isinstance(projected.get("content"), str):
+            projected["content"] = projected["content"][:self.truncate]
+        return projected
+
+def parse_fieldset(fields: Optional[str], view: str) -> Optional[Fieldset]:
+    """
+    Fieldset for a comma-separated `fields` list and/or a view. None means full documents.
+    """
+    if fields:
+        requested = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+        unknown = [field for field in requested if field not in ALLOWED_FIELDS]
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown) or fields}. Allowed fields: {', '.join(ALLOWED_FIELDS)}."
+            )
+    elif view == "summary":
+        requested = SUMMARY_FIELDS
+    else:
+        return None
+    return Fieldset(requested, SUMMARY_CONTENT_LENGTH if view == "summary" else None)
+
+def news_fieldset(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    view: Literal["full", "summary"] = Query("full")
+) -> Optional[Fieldset]:
+    """
+    Dependency for news endpoints that accept ?fields= and ?view=
+    """
+    return parse_fieldset(fields, view)
@@ -0,0 +1,74 @@
+import logging
+import threading
+import time
+from pymongo.errors import PyMongoError
+from app.config.settings import GENERATION_POLL_INTERVAL
+from app.db.mongodb import MongoDB
+from app.utils.outage import database_down, report_database_failure
+
+logger = logging.getLogger(__name__)
+
+class GenerationTracker:
+    """
+    Process-local view of the published scrape generation.
+
+    Mongo is consulted at most once every GENERATION_POLL_INTERVAL seconds, from
+    a background thread and never while it is known to be down, so request paths
+    can key caches on the generation without a database round trip.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(GenerationTracker, cls).__new__(cls)
+            cls._instance.state = {"generation": 0, "published_at": None}
+            cls._instance.checked_at = None
+            cls._instance.lock = threading.Lock()
+            cls._instance.polling = False
+            cls._instance.listeners = []
+        return cls._instance
+
+    def add_listener(self, callback):
+        """Call `callback(state)` whenever a newer generation is observed."""
+        self.listeners.append(callback)
+
+    def current(self):
+        """Return the latest known generation, starting a refresh when the poll interval has passed."""
+        if self._due() and not database_down():
+            with self.lock:
+                if self.polling or not self._due():
+                    return self.state
+                self.polling = True
+            threading.Thread(target=self.poll, name="generation-poll", daemon=True).start()
+        return self.state
+
+    def poll(self):
+        """Read the published generation from Mongo; blocks, so request paths leave it to a thread."""
+        try:
+            state = MongoDB().get_generation()
+            with self.lock:
+                self._apply(state)
+        except PyMongoError as e:
+            report_database_failure()
+            logger.warning(f"Could not refresh scrape generation: {e}")
+        finally:
+            # Timed from the end of the call, so a slow poll is not immediately repeated
+            self.checked_at = time.monotonic()
+            self.polling = False
+
+    def _due(self):
+        return self.checked_at is None or time.monotonic() - self.checked_at >= GENERATION_POLL_INTERVAL
+
+    def update(self, state):
+        """Record a generation this process has just published."""
+        with self.lock:
+            self._apply(state)
+            self.checked_at = time.monotonic()
+
+    def _apply(self, state):
+        if state["generation"] >= self.state["generation"]:
+            newer = state["generation"] > self.state["generation"]
+            self.state = state
+            if newer:
+                for callback in self.listeners:
+                    callback(state)
@@ -0,0 +1,82 @@
+from fastapi import Request, Response, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from email.utils import format_datetime, parsedate_to_datetime
+from app.config.settings import NEWS_CACHE_MAX_AGE, COUNT_NOT_MODIFIED_REQUESTS
+from app.db.mongodb import as_utc
+from app.utils.auth_middleware import get_api_key_or_error, check_rate_limit, check_minute_limit, validated_rate_limit
+from app.utils.generation import GenerationTracker
+from app.utils.response_cache import strip_coding
+import hashlib
+import json
+
+def compute_etag(generation: int, request: Request, max_results: int) -> str:
+    """
+    Strong ETag for a read of `request` against the given scrape generation.
+    `max_results` is the caller's tier cap, which the requested limit is clamped to.
+    Articles removed by the NEWS_RETENTION_DAYS TTL do not change the tag until
+    the next published scrape.
+    """
+    params = sorted(request.query_params.multi_items())
+    raw = json.dumps([generation, request.url.path, params, max_results])
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+def matching_etag(if_none_match: str, etag: str):
+    """
+    The tag in If-None-Match that matches `etag` in any content coding, by weak
+    comparison as required for If-None-Match, or None.
+    """
+    for tag in (tag.strip() for tag in if_none_match.split(",")):
+        if tag == "*":
+            return etag
+        tag = tag.removeprefix("W/")
+        if strip_coding(tag) == etag:
+            return tag
+    return None
+
+def not_modified_since(if_modified_since: str, published_at) -> bool:
+    try:
+        return published_at.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+async def conditional_news_request(request: Request, response: Response, api_key: str = Depends(get_api_key_or_error)):
+    """
+    Answer revalidation requests with 304 before any news query runs.
+
+    Must be listed before rate_limit_middleware: a 304 only counts against the
+    daily quota when COUNT_NOT_MODIFIED_REQUESTS is enabled, but always against
+    the per-minute limit.
+    """
+    rate_limit = validated_rate_limit(api_key)
+    state = GenerationTracker().current()
+    published_at = state["published_at"]
+    etag = compute_etag(state["generation"], request, rate_limit["max_results_per_request"])
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={NEWS_CACHE_MAX_AGE}, must-revalidate"
+    }
+    if published_at is not None:
+        headers["Last-Modified"] = format_datetime(as_utc(published_at), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        matched = matching_etag(if_none_match, etag)
+        not_modified = matched is not None
+        if not_modified:
+            # A 304 carries the tag of the representation the client holds
+            headers["ETag"] = matched
+    else:
+        not_modified = bool(if_modified_since and published_at and not_modified_since(if_modified_since, published_at))
+
+    if not_modified:
+        if COUNT_NOT_MODIFIED_REQUESTS:
+            await run_in_threadpool(check_rate_limit, api_key)
+        else:
+            check_minute_limit(api_key, rate_limit)
+        raise HTTPException(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    request.state.generation = state["generation"]
+    request.state.cache_headers = headers
+    return etag
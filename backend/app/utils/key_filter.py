@@ -0,0 +1,171 @@
+import logging
+import math
+import threading
+import time
+from datetime import timedelta
+from pymongo.errors import PyMongoError
+from app.config.settings import (
+    KEY_FILTER_CAPACITY, KEY_FILTER_ERROR_RATE, KEY_FILTER_REFRESH_SECONDS, KEY_FILTER_REBUILD_SECONDS
+)
+from app.models.api_key import hash_api_key
+
+logger = logging.getLogger(__name__)
+
+# Keys created on other workers are picked up this often at most when an unknown key arrives
+MISS_REFRESH_SECONDS = 1.0
+# Overlap for incremental refreshes, covering clock skew between workers
+CREATED_AT_SKEW = timedelta(minutes=1)
+
+class BloomFilter:
+    """
+    Bit-array Bloom filter over API key hashes. The hashes are HMAC-SHA256 hex
+    digests, already uniform, so bit positions are taken straight from them.
+    """
+    __slots__ = ("size", "hashes", "bits", "count")
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key_hash):
+        # Double hashing on two 64-bit halves of the digest
+        first = int(key_hash[:16], 16)
+        step = int(key_hash[16:32], 16) | 1
+        return ((first + i * step) % self.size for i in range(self.hashes))
+
+    def add(self, key_hash):
+        for position in self._positions(key_hash):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key_hash):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key_hash))
+
+    @property
+    def nbytes(self):
+        return len(self.bits)
+
+class ApiKeyFilter:
+    """
+    Per-worker set of active API key hashes, so requests with made-up keys are
+    rejected without a Mongo lookup. False positives just fall through to
+    Mongo; there are no false negatives once the filter is loaded.
+
+    Keys created here are added immediately. Keys created on other workers are
+    picked up by incremental refreshes on created_at, both periodically and
+    (at most once a second) when an unknown key arrives. Revoked keys stay in
+    the filter until the next rebuild, and Mongo still rejects them.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ApiKeyFilter, cls).__new__(cls)
+            cls._instance.filter = None
+            cls._instance.refreshed_through = None
+            cls._instance.refreshed_at = 0.0
+            cls._instance.rebuilt_at = 0.0
+            cls._instance.lock = threading.Lock()
+            cls._instance.refresh_lock = threading.Lock()
+            cls._instance.rebuild_queued = False
+            cls._instance.rejected = 0
+        return cls._instance
+
+    def might_contain(self, key: str) -> bool:
+        """False only when the key is certainly not an active key."""
+        current = self.filter
+        if current is None:
+            return True  # not loaded yet, let Mongo decide
+        key_hash = hash_api_key(key)
+        if key_hash in current:
+            return True
+        if time.monotonic() - self.refreshed_at >= MISS_REFRESH_SECONDS and self.refresh():
+            if key_hash in self.filter:
+                return True
+        self.rejected += 1
+        return False
+
+    def add(self, key_hash: str):
+        with self.lock:
+            if self.filter is not None:
+                self.filter.add(key_hash)
+
+    def rebuild(self):
+        """Load every active key hash into a fresh filter and swap it in."""
+        from app.db.api_key_manager import ApiKeyManager
+        with self.refresh_lock:
+            started = time.monotonic()
+            api_key_manager = ApiKeyManager()
+            capacity = max(KEY_FILTER_CAPACITY, 2 * api_key_manager.count_active_keys())
+            fresh = BloomFilter(capacity, KEY_FILTER_ERROR_RATE)
+            latest = None
+            for key_hash, created_at in api_key_manager.iter_active_key_hashes():
+                fresh.add(key_hash)
+                if created_at and (latest is None or created_at > latest):
+                    latest = created_at
+            with self.lock:
+                self.filter = fresh
+                self.refreshed_through = latest
+                self.refreshed_at = self.rebuilt_at = time.monotonic()
+            logger.info(
+                f"API key filter loaded {fresh.count} keys into {fresh.nbytes / 1e6:.1f} MB "
+                f"in {time.monotonic() - started:.2f}s"
+            )
+
+    def refresh(self) -> bool:
+        """Add keys created since the last refresh. Returns False if another refresh was already running."""
+        from app.db.api_key_manager import ApiKeyManager
+        if not self.refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            self.refreshed_at = time.monotonic()
+            since = self.refreshed_through - CREATED_AT_SKEW if self.refreshed_through else None
+            for key_hash, created_at in ApiKeyManager().iter_active_key_hashes(since):
+                self.add(key_hash)
+                if created_at and (self.refreshed_through is None or created_at > self.refreshed_through):
+                    self.refreshed_through = created_at
+            return True
+        except PyMongoError as e:
+            logger.warning(f"Could not refresh API key filter: {e}")
+            return False
+        finally:
+            self.refresh_lock.release()
+
+    def run_forever(self):
+        """Keep the filter current; meant for a daemon thread."""
+        while True:
+            try:
+                if self.filter is None or time.monotonic() - self.rebuilt_at >= KEY_FILTER_REBUILD_SECONDS:
+                    self.rebuild()
+                else:
+                    self.refresh()
+            except PyMongoError as e:
+                logger.warning(f"Could not load API key filter: {e}")
+            time.sleep(KEY_FILTER_REFRESH_SECONDS)
+
+    def request_rebuild(self):
+        """Rebuild in the background, e.g. after a key was revoked. Requests made before it starts share one rebuild."""
+        with self.lock:
+            if self.filter is None or self.rebuild_queued:
+                return
+            self.rebuild_queued = True
+        threading.Thread(target=self._queued_rebuild, name="key-filter", daemon=True).start()
+
+    def _queued_rebuild(self):
+        with self.refresh_lock:
+            # Only clear the flag once a running rebuild is done, so revokes during it queue another
+            self.rebuild_queued = False
+        try:
+            self.rebuild()
+        except PyMongoError as e:
+            logger.warning(f"Could not rebuild API key filter: {e}")
+
+    def stats(self):
+        current = self.filter
+        if current is None:
+            return None
+        return {"keys": current.count, "bytes": current.nbytes, "hashes": current.hashes, "rejected": self.rejected}
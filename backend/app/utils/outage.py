@@ -0,0 +1,14 @@
+import time
+from app.config.settings import OUTAGE_RETRY_SECONDS
+
+# Monotonic time until which Mongo is assumed down, so requests go straight
+# to fallbacks instead of each waiting out a server selection timeout
+_outage_until = 0.0
+
+def report_database_failure():
+    """Record a failed Mongo call and skip the database for OUTAGE_RETRY_SECONDS."""
+    global _outage_until
+    _outage_until = time.monotonic() + OUTAGE_RETRY_SECONDS
+
+def database_down() -> bool:
+    return time.monotonic() < _outage_until
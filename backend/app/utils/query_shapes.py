@@ -0,0 +1,27 @@
+from typing import List, Tuple
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING
+
+# Sort keys clients may pass as ?sort_by=, and the stored field each one sorts on.
+# Every entry needs an index that serves it; check_query_plans.py fails otherwise.
+SORT_FIELDS = {"published_at": "published_at", "timestamp_iso": "published_at"}
+SORT_ORDERS = (DESCENDING, ASCENDING)
+# Filters the news endpoints and batch queries accept, and the stored field each one matches
+FILTER_FIELDS = {"category": "categories", "source": "source"}
+
+def sort_spec(sort_by: str = "published_at", sort_order: int = DESCENDING) -> List[Tuple[str, int]]:
+    """Sort on a whitelisted key, with _id as tie-breaker so pages are stable."""
+    return [(SORT_FIELDS[sort_by], sort_order), ("_id", sort_order)]
+
+def parse_sort(sort_by: str, sort_order: int) -> List[Tuple[str, int]]:
+    """
+    Sort for ?sort_by= and ?sort_order=, rejecting keys no index can serve.
+    """
+    if sort_by not in SORT_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot sort by {sort_by}. Allowed sort_by values: {', '.join(SORT_FIELDS)}."
+        )
+    if sort_order not in SORT_ORDERS:
+        raise HTTPException(status_code=400, detail="sort_order must be -1 (newest first) or 1 (oldest first).")
+    return sort_spec(sort_by, sort_order)
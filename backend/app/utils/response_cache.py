@@ -0,0 +1,130 @@
+import gzip
+import threading
+from collections import OrderedDict
+from fastapi import Response
+from starlette.datastructures import MutableHeaders
+from app.config.settings import RESPONSE_CACHE_MAX_ENTRIES, GZIP_LEVEL, BROTLI_QUALITY
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Content codings a body may be served in, besides identity
+CONTENT_CODINGS = ("br", "gzip")
+
+def coded_etag(etag: str, coding: str) -> str:
+    """The strong ETag of a body served in `coding`, e.g. "<hash>-gzip"; identity keeps the plain tag."""
+    if not coding or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{coding}"'
+
+def strip_coding(etag: str) -> str:
+    """The plain tag behind a per-coding ETag."""
+    for coding in CONTENT_CODINGS:
+        suffix = f'-{coding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    """Pick the best of `available` content codings for an Accept-Encoding header, or None for identity."""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip()] = q
+    best, best_q = None, 0.0
+    for coding in available:  # ordered by preference on ties
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+class CompressedPayload:
+    """A JSON body serialized and compressed once, ready to serve in any supported coding."""
+    __slots__ = ("bodies",)
+
+    def __init__(self, body: bytes):
+        self.bodies = {None: body, "gzip": gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+
+    def response(self, accept_encoding: str, headers: dict) -> Response:
+        encoding = choose_encoding(accept_encoding, [coding for coding in CONTENT_CODINGS if coding in self.bodies])
+        headers = {**headers, "Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            if "ETag" in headers:
+                headers["ETag"] = coded_etag(headers["ETag"], encoding)
+        return Response(self.bodies[encoding], media_type="application/json", headers=headers)
+
+class ResponseCache:
+    """
+    Bounded LRU of compressed payloads for hot news pages.
+
+    Entries belong to one scrape generation; the cache empties itself as soon
+    as a newer generation is stored.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ResponseCache, cls).__new__(cls)
+            cls._instance.entries = OrderedDict()
+            cls._instance.generation = 0
+            cls._instance.lock = threading.Lock()
+        return cls._instance
+
+    def get(self, generation: int, key):
+        with self.lock:
+            if generation != self.generation:
+                return None
+            payload = self.entries.get(key)
+            if payload is not None:
+                self.entries.move_to_end(key)
+            return payload
+
+    def put(self, generation: int, key, payload: CompressedPayload):
+        with self.lock:
+            if generation < self.generation:
+                return
+            if generation > self.generation:
+                self.entries.clear()
+                self.generation = generation
+            self.entries[key] = payload
+            self.entries.move_to_end(key)
+            while len(self.entries) > RESPONSE_CACHE_MAX_ENTRIES:
+                self.entries.popitem(last=False)
+
+class CodedETagMiddleware:
+    """
+    Give responses GZipMiddleware encoded on the fly their per-coding ETag.
+    Must be added after GZipMiddleware so it wraps it.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_coded_etag(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", []))
+                headers = MutableHeaders(raw=message["headers"])
+                etag, coding = headers.get("etag"), headers.get("content-encoding")
+                if etag and coding and strip_coding(etag) == etag:
+                    headers["etag"] = coded_etag(etag, coding)
+            await send(message)
+
+        await self.app(scope, receive, send_with_coded_etag)
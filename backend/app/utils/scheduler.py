@@ -1,23 +1,167 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from app.scraper.news_feed_scraper import NewsFeedScraper
-from app.config.settings import SCRAPE_INTERVAL
+from app.config.settings import (
+    SCRAPE_INTERVAL, SCRAPE_MIN_INTERVAL, SCRAPE_MAX_INTERVAL, SCRAPE_MAX_BACKOFF, SCRAPE_JITTER,
+    SCRAPE_CLOSED_INTERVAL, TRADING_HOURS, TRADING_DAYS, TRADING_HOLIDAYS, NEWS_FEED_TIMEZONE
+)
+from app.utils.scrape_metrics import ScrapeMetrics
 import logging
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 logger = logging.getLogger(__name__)
 
+# Interval multipliers after a run that found new articles / found nothing new
+SPEEDUP_FACTOR = 0.5
+SLOWDOWN_FACTOR = 1.5
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+class TradingCalendar:
+    """
+    Trading sessions as daily open/close times on the given weekdays, minus holidays,
+    in the feed's timezone.
+    """
+
+    def __init__(self, hours, days, holidays, tz):
+        """Raises ValueError naming the setting that does not parse."""
+        try:
+            opens, closes = hours.split("-")
+            self.open_time = datetime.strptime(opens.strip(), "%H:%M").time()
+            self.close_time = datetime.strptime(closes.strip(), "%H:%M").time()
+        except ValueError:
+            raise ValueError(f"TRADING_HOURS must look like 09:15-15:30, got {hours!r}")
+        if self.open_time >= self.close_time:
+            raise ValueError(f"TRADING_HOURS must open before it closes, got {hours!r}")
+        names = [day.strip().lower()[:3] for day in days.split(",") if day.strip()]
+        unknown = [name for name in names if name not in WEEKDAYS]
+        if unknown or not names:
+            raise ValueError(f"TRADING_DAYS must list weekdays like mon,tue,wed, got {days!r}")
+        self.days = {WEEKDAYS.index(name) for name in names}
+        try:
+            self.holidays = {date.fromisoformat(day.strip()) for day in holidays.split(",") if day.strip()}
+        except ValueError:
+            raise ValueError(f"TRADING_HOLIDAYS must be comma-separated YYYY-MM-DD dates, got {holidays!r}")
+        try:
+            self.tz = ZoneInfo(tz)
+        except (ValueError, ZoneInfoNotFoundError):
+            raise ValueError(f"NEWS_FEED_TIMEZONE is not a known timezone, got {tz!r}")
+
+    @classmethod
+    def from_settings(cls):
+        """The configured calendar, or None to poll around the clock, also when the settings are invalid."""
+        if not TRADING_HOURS:
+            return None
+        try:
+            return cls(TRADING_HOURS, TRADING_DAYS, TRADING_HOLIDAYS, NEWS_FEED_TIMEZONE)
+        except ValueError as e:
+            logger.error(f"Ignoring trading calendar, polling around the clock: {e}")
+            return None
+
+    def _trading_day(self, day):
+        return day.weekday() in self.days and day not in self.holidays
+
+    def is_open(self, moment):
+        local = moment.astimezone(self.tz)
+        return self._trading_day(local.date()) and self.open_time <= local.time() < self.close_time
+
+    def seconds_until_open(self, moment):
+        """Seconds until the next session opens, 0 while one is open."""
+        if self.is_open(moment):
+            return 0.0
+        local = moment.astimezone(self.tz)
+        for offset in range(15):
+            day = local.date() + timedelta(days=offset)
+            opens = datetime.combine(day, self.open_time, tzinfo=self.tz)
+            if self._trading_day(day) and opens > local:
+                return (opens - local).total_seconds()
+        return float(SCRAPE_CLOSED_INTERVAL)
+
+class AdaptiveScrapeScheduler:
+    """
+    Runs scrape_and_store as a chain of one-shot jobs, each scheduled when the
+    previous run finishes, so runs never overlap. The interval shrinks while new
+    articles keep arriving, grows while the feed is unchanged, backs off
+    exponentially on failures and is jittered to avoid a fixed upstream cadence.
+    """
+
+    def __init__(self, scraper, calendar=None):
+        self.scraper = scraper
+        self.calendar = calendar
+        self.scheduler = BackgroundScheduler()
+        self.interval = float(SCRAPE_INTERVAL)
+        self.failures = 0
+        self.run_lock = threading.Lock()
+
+    def start(self):
+        self.scheduler.start()
+        # Scrape immediately on startup
+        self.schedule(0)
+
+    def shutdown(self):
+        self.scheduler.shutdown()
+
+    def schedule(self, delay):
+        run_date = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        self.scheduler.add_job(self.run, 'date', run_date=run_date, id='scrape_job',
+                               replace_existing=True, max_instances=1, misfire_grace_time=None)
+
+    def run(self):
+        if not self.run_lock.acquire(blocking=False):
+            logger.warning("Previous scrape still running, skipping this run")
+            return
+        # Fallback if bookkeeping below fails; the next run must always be scheduled
+        delay = self.interval
+        try:
+            started = time.monotonic()
+            try:
+                outcome = self.scraper.scrape_and_store()
+            except Exception as e:
+                logger.error(f"Scrape failed: {e}")
+                outcome = {"status": "failed", "inserted": 0}
+            ScrapeMetrics().record_run(outcome, time.monotonic() - started)
+            delay = self.next_delay(outcome)
+            logger.info(f"Scrape {outcome['status']}, next run in {delay:.0f} seconds")
+        except Exception as e:
+            logger.error(f"Could not compute the next scrape delay: {e}")
+        finally:
+            self.run_lock.release()
+            self.schedule(delay)
+
+    def next_delay(self, outcome, now=None):
+        """Seconds to wait before the next run, updating the adaptive interval."""
+        if outcome["status"] == "failed":
+            self.failures += 1
+            # Capped exponent: past it the backoff is clamped anyway, and 2 ** failures would eventually overflow
+            delay = min(SCRAPE_MAX_BACKOFF, self.interval * 2 ** min(self.failures, 16))
+        else:
+            self.failures = 0
+            if outcome["inserted"]:
+                self.interval = max(SCRAPE_MIN_INTERVAL, self.interval * SPEEDUP_FACTOR)
+            else:
+                self.interval = min(SCRAPE_MAX_INTERVAL, self.interval * SLOWDOWN_FACTOR)
+            delay = self.interval
+
+        market_open = None
+        if self.calendar:
+            now = now or datetime.now(timezone.utc)
+            market_open = self.calendar.is_open(now)
+            if not market_open:
+                # Poll slowly while closed, but be back in time for the open
+                delay = max(delay, min(SCRAPE_CLOSED_INTERVAL, self.calendar.seconds_until_open(now)))
+
+        delay *= random.uniform(1 - SCRAPE_JITTER, 1 + SCRAPE_JITTER)
+        ScrapeMetrics().record_schedule(self.interval, delay, self.failures, market_open)
+        return delay
+
 def start_scheduler():
     """
-    Start the background scheduler for periodic scraping
+    Start the background scheduler for adaptive periodic scraping
     """
-    scraper = NewsFeedScraper()
-    scheduler = BackgroundScheduler()
-    
-    # Add job to run every SCRAPE_INTERVAL seconds
-    scheduler.add_job(scraper.scrape_and_store, 'interval', seconds=SCRAPE_INTERVAL, 
-                     id='scrape_job', replace_existing=True)
-    
-    # Start the scheduler
+    scheduler = AdaptiveScrapeScheduler(NewsFeedScraper(), TradingCalendar.from_settings())
     scheduler.start()
-    logger.info(f"Scheduler started. Scraping every {SCRAPE_INTERVAL} seconds")
-    
+    logger.info(f"Scheduler started. Scraping every {SCRAPE_MIN_INTERVAL}-{SCRAPE_MAX_INTERVAL} seconds, starting at {SCRAPE_INTERVAL}")
+
     return scheduler
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+# Freshness samples kept for percentiles, one per newly archived article
+FRESHNESS_SAMPLES = 1000
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class ScrapeMetrics:
+    """
+    Process-local counters for the scraper: upstream request volume, run
+    outcomes and pipeline stages, the adaptive schedule, achieved freshness (ingested_at minus
+    published_at of newly archived articles) and enrichment passes.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ScrapeMetrics, cls).__new__(cls)
+            cls._instance.lock = threading.Lock()
+            cls._instance.started_at = time.monotonic()
+            cls._instance.upstream = {"requests": 0, "errors": 0, "bytes": 0, "last_status": None}
+            cls._instance.request_times = deque()
+            cls._instance.runs = {"new": 0, "unchanged": 0, "failed": 0}
+            cls._instance.last_run = None
+            cls._instance.schedule = None
+            cls._instance.freshness = deque(maxlen=FRESHNESS_SAMPLES)
+            cls._instance.enrichment = None
+            cls._instance.stages = None
+        return cls._instance
+
+    def record_request(self, status, size=0):
+        """Count one request to the upstream feed; `status` is None when it never got a response."""
+        with self.lock:
+            self.upstream["requests"] += 1
+            self.upstream["bytes"] += size
+            self.upstream["last_status"] = status
+            if status is None or status >= 400:
+                self.upstream["errors"] += 1
+            self.request_times.append(time.monotonic())
+
+    def record_run(self, outcome, duration):
+        with self.lock:
+            self.runs[outcome["status"]] += 1
+            self.last_run = {
+                **outcome,
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+                "duration_seconds": round(duration, 3)
+            }
+
+    def record_freshness(self, articles):
+        """Sample publication-to-ingestion delay for newly archived articles."""
+        with self.lock:
+            for article in articles:
+                delay = (article["ingested_at"] - article["published_at"]).total_seconds()
+                self.freshness.append(max(0.0, delay))
+
+    def record_pipeline(self, stages):
+        """Keep per-stage counters and timings of the last scrape run."""
+        with self.lock:
+            self.stages = stages
+
+    def record_enrichment(self, stats):
+        """Keep the last enrichment pass and running page totals."""
+        with self.lock:
+            totals = self.enrichment["totals"] if self.enrichment else {"fetched_pages": 0, "failed_pages": 0, "cached_pages": 0}
+            totals = {key: totals[key] + stats[key] for key in totals}
+            self.enrichment = {"last_pass": stats, "totals": totals}
+
+    def record_schedule(self, interval, delay, failures, market_open):
+        with self.lock:
+            self.schedule = {
+                "interval_seconds": round(interval, 1),
+                "next_run_in_seconds": round(delay, 1),
+                "next_run_at": datetime.fromtimestamp(time.time() + delay, timezone.utc).isoformat(),
+                "consecutive_failures": failures,
+                "market_open": market_open
+            }
+
+    def report(self):
+        with self.lock:
+            now = time.monotonic()
+            while self.request_times and now - self.request_times[0] > 3600:
+                self.request_times.popleft()
+            freshness = None
+            if self.freshness:
+                freshness = {
+                    "samples": len(self.freshness),
+                    "p50_seconds": round(_percentile(self.freshness, 0.5), 1),
+                    "p90_seconds": round(_percentile(self.freshness, 0.9), 1),
+                    "max_seconds": round(max(self.freshness), 1)
+                }
+            return {
+                "uptime_seconds": round(now - self.started_at),
+                "upstream": {**self.upstream, "requests_last_hour": len(self.request_times)},
+                "runs": dict(self.runs),
+                "last_run": self.last_run,
+                "schedule": self.schedule,
+                "freshness": freshness,
+                "stages": self.stages,
+                "enrichment": self.enrichment
+            }
@@ -0,0 +1,16 @@
+from bson import ObjectId
+from datetime import datetime
+from typing import Any
+import json
+
+class JSONEncoder(json.JSONEncoder):
+    def default(self, o):
+        if isinstance(o, ObjectId):
+            return str(o)
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return json.JSONEncoder.default(self, o)
+
+def encode_json(content: Any) -> bytes:
+    """Serialize exactly once, in the compact form JSONResponse would produce."""
+    return JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode(content).encode("utf-8")
@@ -0,0 +1,56 @@
+"""
+Explain every query shape the API sends to MongoDB and fail on collection
+scans, blocking sorts, or plans that examine far more documents than they return.
+
+    python3 check_query_plans.py
+    python3 check_query_plans.py --uri mongodb://localhost:27017 --db-name finance_news_test --create-indexes
+
+Exits with status 1 if any shape has a problem, printing a suggested index for it.
+"""
+import argparse
+import json
+import os
+import sys
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="check_query_plans.py", description="Check MongoDB query plans for every API query shape")
+    parser.add_argument("--uri", help="MongoDB to explain against (default: MONGODB_URI)")
+    parser.add_argument("--db-name", help="database name (default: DB_NAME)")
+    parser.add_argument("--create-indexes", action="store_true", help="run the migrations first, e.g. on a fresh test database")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    # Settings are read at import time, so point them at the target database first
+    if args.uri:
+        os.environ["MONGODB_URI"] = args.uri
+        os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+        os.environ.setdefault("GOOGLE_SEARCH_URL", "https://www.google.com/search?q=")
+    if args.db_name:
+        os.environ["DB_NAME"] = args.db_name
+
+    from app.db.query_plans import check_query_plans
+    if args.create_indexes:
+        from app.db.migrations import run_migrations
+        run_migrations()
+
+    results = check_query_plans()
+    failed = [result for result in results if result["problems"]]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            status = "FAIL" if result["problems"] else "ok"
+            print(f"{status:<6}{result['shape']:<48}{' > '.join(reversed(result['stages']))}")
+            for problem in result["problems"]:
+                print(f"      {problem}")
+            for note in result["allowed"]:
+                print(f"      allowed {note}")
+            if result.get("suggested_index"):
+                print(f"      suggested index on {result['collection']}: {result['suggested_index']}")
+        print(f"\n{len(results) - len(failed)} of {len(results)} query shapes use indexes for both filter and sort without wasteful scans")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
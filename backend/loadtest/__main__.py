@@ -0,0 +1,94 @@
+"""
+End-to-end load test for app.main:app.
+
+    python -m loadtest --fake --duration 20 --output run.json
+    python -m loadtest --mongodb-uri mongodb://localhost:27017 --compare baseline.json
+
+Run from backend/. Seeds its own database (dropped afterwards unless --keep),
+drives weighted traffic across the news and auth routes, and writes per-route
+and per-tier throughput and p50/p95/p99 latency as JSON.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+
+from loadtest import harness, report
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Load test the Finance News API")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--mongodb-uri", default="mongodb://localhost:27017", help="local mongod to seed and serve from")
+    target.add_argument("--fake", action="store_true", help="use an in-process mongomock database (no $text search)")
+    parser.add_argument("--db-name", default="finance_news_loadtest")
+    parser.add_argument("--base-url", help="drive a running server instead of the in-process app; it must use the same database")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--keys", type=int, default=30, help="API keys, spread across the RATE_LIMITS tiers")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of traffic")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests (0: duration only)")
+    parser.add_argument("--rate-limit-scale", type=float, default=1.0, help="multiply tier limits (in-process only)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="loadtest-results.json")
+    parser.add_argument("--compare", help="previous results file to diff against")
+    parser.add_argument("--fail-threshold", type=float, default=20.0, help="percent p95/throughput regression that fails --compare")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded database")
+    return parser.parse_args(argv)
+
+async def run(args, seeded, rng):
+    import httpx
+
+    # mongomock has no $text support, so search is only exercised against a real mongod
+    excluded = {"GET /news/search"} if args.fake else set()
+    generator = harness.TrafficGenerator(seeded, rng, excluded)
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+    else:
+        from app.main import app
+        # Lifespan is not run, since no scraper is wanted; prepare_app does the rest of it
+        harness.prepare_app()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://loadtest", timeout=30)
+    async with client:
+        return await harness.drive(client, generator, args.concurrency, args.duration, args.requests)
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    harness.configure_environment(args.mongodb_uri, args.db_name, args.fake)
+    if args.rate_limit_scale != 1.0:
+        harness.scale_rate_limits(args.rate_limit_scale)
+
+    rng = random.Random(args.seed)
+    print(f"Seeding {args.articles} articles, {args.keys} API keys and {args.users} users into {args.db_name}...")
+    seeded = harness.seed(args.articles, args.keys, args.users, rng)
+    try:
+        samples, elapsed = asyncio.run(run(args, seeded, rng))
+    finally:
+        if not args.keep and not args.fake:
+            harness.drop_database(args.db_name)
+
+    settings = {name: value for name, value in vars(args).items() if name not in ("compare", "output", "keep")}
+    results = report.build_report(samples, elapsed, settings)
+    report.write_report(results, args.output)
+
+    print(f"{'route':<32}{'reqs':>8}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}  status")
+    for section in ("routes", "tiers"):
+        for name, stats in results[section].items():
+            print(f"{name:<32}{stats['requests']:>8}{stats['throughput_rps']:>10}{stats['p50_ms']:>10}"
+                  f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}  {stats['status']}")
+        print()
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        lines, regressed = report.compare_reports(baseline, results, args.fail_threshold)
+        print("\n".join(lines))
+        if regressed:
+            print(f"Regression above {args.fail_threshold}% detected (marked with !)")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
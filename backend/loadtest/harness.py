@@ -0,0 +1,220 @@
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+# Mirrors the scraper's source names and keyword categories
+SOURCES = [
+    "Economic Times", "Moneycontrol", "LiveMint", "Bloomberg Quint", "NDTV",
+    "Hindu Business", "Business Standard", "Financial Express", "CNBC-TV18", "Finshots"
+]
+CATEGORIES = ["stocks", "market", "economy", "banking", "tech", "policy", "corporate", "finance"]
+WORDS = [
+    "sensex", "nifty", "rupee", "inflation", "earnings", "rbi", "sebi", "bank", "loan", "gdp",
+    "rally", "profit", "dividend", "policy", "fintech", "exports", "crude", "bond", "yield", "ipo"
+]
+SEARCH_TERMS = ["sensex", "rupee", "inflation", "earnings", "rbi", "ipo"]
+USER_PASSWORD = "loadtest-password"
+
+# Relative weights of each route in the generated traffic
+ROUTE_MIX = {
+    "GET /news": 3,
+    "GET /news/latest": 4,
+    "GET /news/latest (revalidate)": 2,
+    "GET /news/category": 3,
+    "GET /news/source": 2,
+    "GET /news/search": 2,
+    "POST /news/batch": 1,
+    "POST /auth/user/login": 1,
+    "GET /auth/user/me": 1,
+    "GET /auth/user/api-keys": 1,
+    "POST /auth/register": 1
+}
+
+def configure_environment(mongodb_uri, db_name, fake):
+    """
+    Point the app at the load-test database. Must run before anything under
+    app/ is imported, since settings are read at import time.
+    """
+    os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+    os.environ.setdefault("GOOGLE_SEARCH_URL", "https://www.google.com/search?q=")
+    os.environ["DB_NAME"] = db_name
+    if fake:
+        try:
+            import mongomock
+        except ImportError:
+            raise SystemExit("--fake needs the optional mongomock package: pip install mongomock")
+        import pymongo
+        shared_client = mongomock.MongoClient(tz_aware=True)
+        pymongo.MongoClient = lambda *args, **kwargs: shared_client
+        os.environ["MONGODB_URI"] = "mongodb://in-process-fake"
+    else:
+        os.environ["MONGODB_URI"] = mongodb_uri
+
+def scale_rate_limits(factor):
+    """Raise every tier's request limits so traffic measures serving rather than rejection."""
+    from app.utils.auth_middleware import RATE_LIMITS
+    for limits in RATE_LIMITS.values():
+        limits["requests_per_day"] = int(limits["requests_per_day"] * factor)
+        limits["requests_per_minute"] = int(limits["requests_per_minute"] * factor)
+
+def make_article(index, now, rng):
+    words = rng.sample(WORDS, 6)
+    return {
+        "title": f"{' '.join(words[:4]).capitalize()} update #{index}",
+        "content": " ".join(rng.choice(WORDS) for _ in range(40)),
+        "url": f"https://example.com/news/{index}",
+        "source": rng.choice(SOURCES),
+        "categories": sorted(rng.sample(CATEGORIES, rng.randint(1, 3))),
+        "published_at": now - timedelta(minutes=index * 7),
+        "timestamp": f"{index * 7} minutes ago",
+        "timestamp_iso": (now - timedelta(minutes=index * 7)).isoformat()
+    }
+
+def seed(article_count, key_count, user_count, rng):
+    """
+    Seed articles, API keys spread evenly across RATE_LIMITS tiers, and users.
+    Returns the credentials the traffic generator needs.
+    """
+    from app.db.mongodb import MongoDB
+    from app.db.api_key_manager import ApiKeyManager
+    from app.db.migrations import run_migrations
+    from app.models.user import UserCreate
+    from app.utils.auth_middleware import RATE_LIMITS
+
+    run_migrations()
+    db = MongoDB()
+    now = datetime.now(timezone.utc)
+    for start in range(0, article_count, 1000):
+        db.insert_news([make_article(i, now, rng) for i in range(start, min(start + 1000, article_count))])
+    db.publish_generation()
+
+    api_key_manager = ApiKeyManager()
+    tiers = list(RATE_LIMITS)
+    keys = []
+    for i in range(key_count):
+        tier = tiers[i % len(tiers)]
+        key = api_key_manager.create_api_key(f"loadtest-key-{i}@example.com", f"Load Test {i}", tier=tier)
+        keys.append((key, tier))
+
+    users = []
+    for i in range(user_count):
+        email = f"loadtest-user-{i}@example.com"
+        if not db.get_user_by_email(email):
+            db.create_user(UserCreate(email=email, name=f"Load User {i}", password=USER_PASSWORD))
+        users.append(email)
+    return {"keys": keys, "users": users}
+
+def prepare_app():
+    """
+    Do the serving part of the app's lifespan for in-process runs: keep the
+    hot window in step with the scrape generation and load the API key filter.
+    The scraper and migrations are left out; seeding already migrated.
+    """
+    from app.db.memory_store import MemoryStore
+    from app.utils.generation import GenerationTracker
+    from app.utils.key_filter import ApiKeyFilter
+
+    tracker = GenerationTracker()
+    if MemoryStore().refresh not in tracker.listeners:
+        tracker.add_listener(MemoryStore().refresh)
+    # Poll once up front so the first requests already see the seeded generation
+    tracker.poll()
+    ApiKeyFilter().rebuild()
+
+def drop_database(db_name):
+    from app.db.mongodb import MongoDB
+    MongoDB().client.drop_database(db_name)
+
+class TrafficGenerator:
+    """Builds randomized requests for every news and auth route."""
+
+    def __init__(self, seeded, rng, excluded_routes=()):
+        self.keys = seeded["keys"]
+        self.users = seeded["users"]
+        self.rng = rng
+        self.routes = [route for route in ROUTE_MIX if route not in excluded_routes]
+        self.weights = [ROUTE_MIX[route] for route in self.routes]
+        self.tokens = {}
+        self.etags = {}
+        self.registrations = 0
+
+    def next_request(self):
+        """Return (route, tier, method, url, request kwargs)."""
+        route = self.rng.choices(self.routes, self.weights)[0]
+        if route.startswith("POST /auth") or route.startswith("GET /auth"):
+            return self._auth_request(route)
+        key, tier = self.rng.choice(self.keys)
+        headers = {"X-API-Key": key, "Accept-Encoding": "gzip, br"}
+        limit = self.rng.choice([10, 20, 50])
+        if route == "GET /news":
+            url = f"/api/v1/news?limit={limit}&skip={self.rng.choice([0, 0, 20, 100])}"
+        elif route.startswith("GET /news/latest"):
+            url = f"/api/v1/news/latest?limit={limit}"
+            etag = self.etags.get((key, url))
+            if route.endswith("(revalidate)") and etag:
+                headers["If-None-Match"] = etag
+        elif route == "GET /news/category":
+            url = f"/api/v1/news/category/{self.rng.choice(CATEGORIES)}?limit={limit}"
+        elif route == "GET /news/source":
+            url = f"/api/v1/news/source/{self.rng.choice(SOURCES)}?limit={limit}"
+        elif route == "GET /news/search":
+            url = f"/api/v1/news/search?query={self.rng.choice(SEARCH_TERMS)}&limit={limit}"
+        else:
+            queries = [{"type": "latest", "limit": 10}]
+            queries += [{"type": "category", "value": c, "limit": 10} for c in self.rng.sample(CATEGORIES, 5)]
+            queries += [{"type": "source", "value": s, "limit": 10} for s in self.rng.sample(SOURCES, 3)]
+            return route, tier, "POST", "/api/v1/news/batch", {"headers": headers, "json": {"queries": queries}}
+        return route, tier, "GET", url, {"headers": headers}
+
+    def _auth_request(self, route):
+        email = self.rng.choice(self.users)
+        token = self.tokens.get(email)
+        if route == "POST /auth/user/login" or (token is None and route != "POST /auth/register"):
+            body = {"email": email, "password": USER_PASSWORD}
+            return "POST /auth/user/login", "user", "POST", "/api/v1/auth/user/login", {"json": body}
+        if route == "POST /auth/register":
+            self.registrations += 1
+            body = {"user_email": f"loadtest-signup-{self.registrations}@example.com", "user_name": "Signup"}
+            return route, "user", "POST", "/api/v1/auth/register", {"json": body}
+        path = "/api/v1/auth/user/me" if route == "GET /auth/user/me" else "/api/v1/auth/user/api-keys"
+        return route, "user", "GET", path, {"headers": {"Authorization": f"Bearer {token}"}}
+
+    def observe(self, route, method, url, kwargs, response):
+        """Remember tokens and ETags so later requests can reuse them."""
+        if route == "POST /auth/user/login" and response.status_code == 200:
+            self.tokens[kwargs["json"]["email"]] = response.json()["access_token"]
+        elif route.startswith("GET /news/latest") and "etag" in response.headers:
+            self.etags[(kwargs["headers"]["X-API-Key"], url)] = response.headers["etag"]
+
+async def drive(client, generator, concurrency, duration, max_requests):
+    """
+    Run `concurrency` workers until `duration` seconds pass or `max_requests`
+    have been issued. Returns raw (route, tier, status, seconds) samples.
+    """
+    import httpx
+
+    samples = []
+    deadline = time.perf_counter() + duration
+    issued = 0
+
+    async def worker():
+        nonlocal issued
+        while time.perf_counter() < deadline and (not max_requests or issued < max_requests):
+            issued += 1
+            route, tier, method, url, kwargs = generator.next_request()
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                await response.aread()
+                status = response.status_code
+            except httpx.HTTPError:
+                response, status = None, 0
+            samples.append((route, tier, status, time.perf_counter() - started))
+            if response is not None:
+                generator.observe(route, method, url, kwargs, response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started
@@ -0,0 +1,173 @@
+"""
+Random-key flood benchmark for the API key filter.
+
+    python -m loadtest.key_flood --fake --keys 100000
+    python -m loadtest.key_flood --mongodb-uri mongodb://localhost:27017 --keys 1000000
+
+Run from backend/. Seeds active API keys, then measures how long the per-worker
+filter takes to build, its memory, its false-positive rate on random keys, and
+how fast random keys are rejected: by the filter alone, by a Mongo lookup, and
+through the app with and without the filter, counting the lookups that reach Mongo.
+"""
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from loadtest import harness
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m loadtest.key_flood", description="Flood the API with random keys")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--mongodb-uri", default="mongodb://localhost:27017", help="local mongod to seed and query")
+    target.add_argument("--fake", action="store_true", help="use an in-process mongomock database")
+    parser.add_argument("--db-name", default="finance_news_keyflood")
+    parser.add_argument("--keys", type=int, default=100000, help="active API keys to seed")
+    parser.add_argument("--probes", type=int, default=200000, help="random keys checked against the filter")
+    parser.add_argument("--lookups", type=int, default=2000, help="random keys checked against Mongo directly")
+    parser.add_argument("--requests", type=int, default=2000, help="random-key requests sent through the app per run")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded database")
+    return parser.parse_args(argv)
+
+def random_key():
+    return secrets.token_hex(16)
+
+def seed_keys(count):
+    """Insert `count` active keys straight into the collection; returns a few of them in plaintext."""
+    from app.db.api_key_manager import ApiKeyManager
+    from app.models.api_key import hash_api_key, api_key_prefix
+
+    api_key_manager = ApiKeyManager()
+    # Older than the refresh overlap, as almost every key is in a long-running deployment
+    created_at = datetime.now(timezone.utc) - timedelta(days=1)
+    sample = []
+    for start in range(0, count, 10000):
+        batch = []
+        for i in range(start, min(start + 10000, count)):
+            key = random_key()
+            if len(sample) < 100:
+                sample.append(key)
+            batch.append({
+                "key_hash": hash_api_key(key), "key_prefix": api_key_prefix(key),
+                "user_email": f"flood-{i}@example.com", "user_name": f"Flood {i}",
+                "created_at": created_at, "is_active": True, "tier": "premium", "total_requests": 0
+            })
+        api_key_manager.collection.insert_many(batch, ordered=False)
+    return sample
+
+def count_lookups():
+    """Count calls to validate_api_key, i.e. key checks that reach Mongo."""
+    from app.db.api_key_manager import ApiKeyManager
+
+    counter = {"lookups": 0}
+    validate = ApiKeyManager.validate_api_key
+
+    def counted(self, key):
+        counter["lookups"] += 1
+        return validate(self, key)
+    ApiKeyManager.validate_api_key = counted
+    return counter
+
+async def flood(app, keys, concurrency):
+    """Send one /news/latest request per key; returns (status counts, seconds)."""
+    import httpx
+
+    statuses = {}
+    pending = iter(keys)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://keyflood", timeout=30) as client:
+        async def worker():
+            for key in pending:
+                response = await client.get("/api/v1/news/latest?limit=10", headers={"X-API-Key": key})
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return statuses, time.perf_counter() - started
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    harness.configure_environment(args.mongodb_uri, args.db_name, args.fake)
+
+    from app.db.api_key_manager import ApiKeyManager
+    from app.config.settings import KEY_FILTER_CAPACITY
+    from app.db.migrations import run_migrations
+    from app.db.mongodb import MongoDB
+    from app.models.api_key import hash_api_key
+    from app.utils.key_filter import ApiKeyFilter
+
+    run_migrations()
+    db = MongoDB()
+    now = datetime.now(timezone.utc)
+    db.insert_news([harness.make_article(i, now, random.Random(i)) for i in range(50)])
+    db.publish_generation()
+    print(f"Seeding {args.keys} API keys into {args.db_name}...")
+    valid = seed_keys(args.keys)
+    results = {"keys": args.keys}
+    try:
+        key_filter = ApiKeyFilter()
+        started = time.perf_counter()
+        key_filter.rebuild()
+        stats = key_filter.stats()
+        results["filter"] = {
+            "build_seconds": round(time.perf_counter() - started, 3),
+            "capacity": max(KEY_FILTER_CAPACITY, 2 * args.keys),
+            "bytes": stats["bytes"],
+            "hashes": stats["hashes"]
+        }
+
+        # Membership only, on precomputed hashes
+        probes = [hash_api_key(random_key()) for _ in range(args.probes)]
+        current = key_filter.filter
+        started = time.perf_counter()
+        false_positives = sum(1 for probe in probes if probe in current)
+        elapsed = time.perf_counter() - started
+        results["filter"]["false_positive_rate"] = round(false_positives / max(1, args.probes), 6)
+        results["filter"]["membership_checks_per_second"] = round(args.probes / elapsed)
+        assert all(hash_api_key(key) in current for key in valid), "filter missed a seeded key"
+
+        # Full rejection path: hashing plus membership, as the auth dependency does it
+        started = time.perf_counter()
+        for _ in range(args.probes):
+            key_filter.might_contain(random_key())
+        results["filter"]["rejections_per_second"] = round(args.probes / (time.perf_counter() - started))
+
+        api_key_manager = ApiKeyManager()
+        started = time.perf_counter()
+        for _ in range(args.lookups):
+            api_key_manager.validate_api_key(random_key())
+        results["mongo_lookups_per_second"] = round(args.lookups / (time.perf_counter() - started))
+
+        from app.main import app
+        counter = count_lookups()
+        for label, loaded in (("app_without_filter", None), ("app_with_filter", current)):
+            key_filter.filter = loaded
+            counter["lookups"] = 0
+            keys = [random_key() for _ in range(args.requests)]
+            statuses, elapsed = asyncio.run(flood(app, keys, args.concurrency))
+            results[label] = {
+                "requests": args.requests,
+                "requests_per_second": round(args.requests / elapsed),
+                "mongo_lookups": counter["lookups"],
+                "status": statuses
+            }
+        statuses, _ = asyncio.run(flood(app, valid, args.concurrency))
+        results["valid_keys_status"] = statuses
+    finally:
+        if not args.keep and not args.fake:
+            harness.drop_database(args.db_name)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import json
+import math
+import platform
+from collections import defaultdict
+from datetime import datetime, timezone
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(latencies, statuses, duration):
+    """Throughput, latency percentiles (ms) and status counts for one group of samples."""
+    ordered = sorted(latencies)
+    errors = sum(count for status, count in statuses.items() if status >= 500 or status == 0)
+    return {
+        "requests": len(ordered),
+        "throughput_rps": round(len(ordered) / duration, 2) if duration else 0.0,
+        "p50_ms": _ms(percentile(ordered, 50)),
+        "p95_ms": _ms(percentile(ordered, 95)),
+        "p99_ms": _ms(percentile(ordered, 99)),
+        "max_ms": _ms(ordered[-1] if ordered else None),
+        "errors": errors,
+        "status": {str(status): count for status, count in sorted(statuses.items())}
+    }
+
+def build_report(samples, duration, settings):
+    """
+    Group raw (route, tier, status, seconds) samples per route and per tier.
+    """
+    groups = {"routes": defaultdict(list), "tiers": defaultdict(list)}
+    for route, tier, status, seconds in samples:
+        groups["routes"][route].append((status, seconds))
+        groups["tiers"][tier].append((status, seconds))
+    groups["overall"] = {"all": [(status, seconds) for _, _, status, seconds in samples]}
+
+    report = {
+        "meta": {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "duration_s": round(duration, 3),
+            "settings": settings
+        }
+    }
+    for section, grouped in groups.items():
+        report[section] = {}
+        for name, rows in sorted(grouped.items()):
+            statuses = defaultdict(int)
+            for status, _ in rows:
+                statuses[status] += 1
+            report[section][name] = summarize([seconds for _, seconds in rows], statuses, duration)
+    report["overall"] = report["overall"].get("all", summarize([], {}, duration))
+    return report
+
+def write_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def compare_reports(baseline, current, threshold_pct):
+    """
+    Diff two reports route by route. Returns printable lines and whether any
+    route's p95 or throughput regressed by more than threshold_pct.
+    """
+    lines = [f"{'route':<34}{'rps':>18}{'p95 ms':>20}{'p99 ms':>20}"]
+    regressed = False
+    for route in sorted(set(baseline.get("routes", {})) | set(current.get("routes", {}))):
+        before = baseline.get("routes", {}).get(route)
+        after = current.get("routes", {}).get(route)
+        if not before or not after:
+            lines.append(f"{route:<34}{'only in ' + ('current' if after else 'baseline'):>18}")
+            continue
+        rps_delta = _delta(before["throughput_rps"], after["throughput_rps"])
+        p95_delta = _delta(before["p95_ms"], after["p95_ms"])
+        p99_delta = _delta(before["p99_ms"], after["p99_ms"])
+        if (p95_delta is not None and p95_delta > threshold_pct) or (rps_delta is not None and -rps_delta > threshold_pct):
+            regressed = True
+            route_label = f"{route} !"
+        else:
+            route_label = route
+        lines.append(
+            f"{route_label:<34}"
+            f"{_cell(before['throughput_rps'], after['throughput_rps'], rps_delta):>18}"
+            f"{_cell(before['p95_ms'], after['p95_ms'], p95_delta):>20}"
+            f"{_cell(before['p99_ms'], after['p99_ms'], p99_delta):>20}"
+        )
+    return lines, regressed
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+def _delta(before, after):
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+def _cell(before, after, delta):
+    if delta is None:
+        return f"{before} -> {after}"
+    return f"{after} ({delta:+.1f}%)"
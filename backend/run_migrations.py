@@ -0,0 +1,5 @@
+from app.db.migrations import run_migrations
+
+print("Running migrations...")
+run_migrations()
+print("Done!")
@@ -2,5 +2,5 @@ from app.scraper.news_feed_scraper import NewsFeedScraper
 
 print("Starting scraper...")
 scraper = NewsFeedScraper()
-scraper.scrape_and_store()
-print("Done!")
+outcome = scraper.scrape_and_store()
+print(f"Done! {outcome['status']}, {outcome['inserted']} new articles")
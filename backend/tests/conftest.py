@@ -0,0 +1,13 @@
+import os
+import sys
+
+# Settings are read when app/ is first imported, so they go in before any test module loads.
+# Tests that need a mongod use TEST_MONGODB_URI and never the configured database.
+os.environ["MONGODB_URI"] = os.environ.get("TEST_MONGODB_URI", "mongodb://localhost:27017")
+os.environ["DB_NAME"] = "finance_news_test"
+os.environ.setdefault("MONGODB_TIMEOUT_MS", "1000")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("GOOGLE_SEARCH_URL", "https://www.google.com/search?q=")
+
+# app/ and the top-level scripts live next to tests/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,35 @@
+import pytest
+from fastapi import HTTPException
+from app.config.settings import SUMMARY_CONTENT_LENGTH
+from app.utils.fieldsets import DEFAULT_PROJECTION, HEAVY_FIELDS, INTERNAL_FIELDS, SUMMARY_FIELDS, parse_fieldset
+
+def test_full_view_without_fields_means_whole_documents():
+    assert parse_fieldset(None, "full") is None
+    assert parse_fieldset("", "full") is None
+    assert set(DEFAULT_PROJECTION) == set(HEAVY_FIELDS + INTERNAL_FIELDS)
+
+def test_fields_are_trimmed_and_deduplicated_in_order():
+    fieldset = parse_fieldset(" title, url ,title,,source", "full")
+    assert fieldset.fields == ("title", "url", "source")
+    assert fieldset.truncate is None
+    assert not fieldset.heavy
+    assert fieldset.projection() == {"title": 1, "url": 1, "source": 1, "_id": 0}
+
+def test_summary_view_truncates_content():
+    fieldset = parse_fieldset(None, "summary")
+    assert fieldset.fields == SUMMARY_FIELDS
+    assert fieldset.projection()["content"] == {"$substrCP": ["$content", 0, SUMMARY_CONTENT_LENGTH]}
+    document = {"_id": "a1", "title": "RBI holds rates", "content": "x" * (SUMMARY_CONTENT_LENGTH + 50), "categories": ["policy"]}
+    assert fieldset.apply(document) == {"_id": "a1", "title": "RBI holds rates", "content": "x" * SUMMARY_CONTENT_LENGTH}
+
+def test_body_is_heavy_and_including_keeps_order():
+    fieldset = parse_fieldset("body", "full")
+    assert fieldset.heavy
+    assert fieldset.including("_id", "published_at", "body").fields == ("body", "_id", "published_at")
+    assert parse_fieldset("title", "full").key != parse_fieldset("title", "summary").key
+
+@pytest.mark.parametrize("fields", ["title,secret", "article_key", "enrich_retry_after", " , "])
+def test_unknown_or_internal_fields_are_rejected(fields):
+    with pytest.raises(HTTPException) as error:
+        parse_fieldset(fields, "full")
+    assert error.value.status_code == 400
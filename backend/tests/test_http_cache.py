@@ -0,0 +1,67 @@
+import gzip
+import pytest
+from starlette.requests import Request
+from app.utils.http_cache import compute_etag, matching_etag
+from app.utils.response_cache import CompressedPayload, choose_encoding, coded_etag, strip_coding
+
+def request_for(path, query=""):
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query.encode(), "headers": []})
+
+def test_compute_etag_changes_with_generation_query_and_tier():
+    etag = compute_etag(7, request_for("/api/v1/news/latest", "limit=20"), 50)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == compute_etag(7, request_for("/api/v1/news/latest", "limit=20"), 50)
+    assert etag != compute_etag(8, request_for("/api/v1/news/latest", "limit=20"), 50)
+    assert etag != compute_etag(7, request_for("/api/v1/news/latest", "limit=10"), 50)
+    assert etag != compute_etag(7, request_for("/api/v1/news", "limit=20"), 50)
+    assert etag != compute_etag(7, request_for("/api/v1/news/latest", "limit=20"), 10)
+
+def test_compute_etag_ignores_query_parameter_order():
+    first = compute_etag(1, request_for("/api/v1/news", "limit=20&skip=40"), 50)
+    assert first == compute_etag(1, request_for("/api/v1/news", "skip=40&limit=20"), 50)
+
+@pytest.mark.parametrize("coding", ["gzip", "br"])
+def test_each_coding_has_its_own_tag(coding):
+    etag = '"abc123"'
+    tag = coded_etag(etag, coding)
+    assert tag == f'"abc123-{coding}"'
+    assert strip_coding(tag) == etag
+    assert coded_etag(etag, None) == etag
+
+@pytest.mark.parametrize("header, matched", [
+    ('"abc123"', '"abc123"'),
+    ('"abc123-gzip"', '"abc123-gzip"'),
+    ('W/"abc123-br"', '"abc123-br"'),
+    ('"other", "abc123-br"', '"abc123-br"'),
+    ("*", '"abc123"'),
+    ('"other-gzip"', None),
+    ('"abc123-deflate"', None),
+])
+def test_if_none_match_matches_any_coding_of_the_tag(header, matched):
+    assert matching_etag(header, '"abc123"') == matched
+
+@pytest.mark.parametrize("accept_encoding, chosen", [
+    ("gzip, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("identity", None),
+    ("*", "br"),
+    ("", None),
+])
+def test_choose_encoding(accept_encoding, chosen):
+    assert choose_encoding(accept_encoding, ["br", "gzip"]) == chosen
+
+def test_compressed_payload_serves_the_chosen_coding_with_its_tag():
+    body = b'{"status": "success", "data": []}' * 20
+    payload = CompressedPayload(body)
+    response = payload.response("gzip", {"ETag": '"abc123"'})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == '"abc123-gzip"'
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert gzip.decompress(response.body) == body
+
+    identity = payload.response("", {"ETag": '"abc123"'})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == '"abc123"'
+    assert identity.body == body
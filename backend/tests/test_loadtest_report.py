@@ -0,0 +1,48 @@
+from loadtest.report import build_report, compare_reports, percentile, summarize
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([0.2], 99) == 0.2
+    assert percentile([], 50) is None
+
+def test_summarize_counts_server_errors_and_dropped_requests():
+    summary = summarize([0.010, 0.020, 0.030, 0.040], {200: 2, 304: 1, 503: 1, 0: 1}, duration=2.0)
+    assert summary["requests"] == 4
+    assert summary["throughput_rps"] == 2.0
+    assert summary["p50_ms"] == 20.0
+    assert summary["max_ms"] == 40.0
+    assert summary["errors"] == 2
+    assert summary["status"] == {"0": 1, "200": 2, "304": 1, "503": 1}
+
+def test_build_report_groups_samples_by_route_and_tier():
+    samples = [
+        ("GET /news", "free", 200, 0.010),
+        ("GET /news", "pro", 200, 0.030),
+        ("POST /news/batch", "pro", 500, 0.050),
+    ]
+    report = build_report(samples, duration=1.0, settings={"concurrency": 2})
+    assert report["routes"]["GET /news"]["requests"] == 2
+    assert report["routes"]["POST /news/batch"]["errors"] == 1
+    assert report["tiers"]["pro"]["requests"] == 2
+    assert report["overall"]["requests"] == 3
+    assert report["meta"]["settings"] == {"concurrency": 2}
+
+def test_compare_reports_flags_p95_and_throughput_regressions():
+    def report(rps, p95):
+        return {"routes": {"GET /news": {"throughput_rps": rps, "p95_ms": p95, "p99_ms": p95}}}
+
+    _, regressed = compare_reports(report(100, 10), report(98, 10.5), threshold_pct=10)
+    assert not regressed
+    lines, regressed = compare_reports(report(100, 10), report(100, 12), threshold_pct=10)
+    assert regressed and lines[1].startswith("GET /news !")
+    _, regressed = compare_reports(report(100, 10), report(80, 10), threshold_pct=10)
+    assert regressed
+
+def test_compare_reports_lists_routes_missing_from_one_side():
+    baseline = {"routes": {"GET /news": {"throughput_rps": 1, "p95_ms": 1, "p99_ms": 1}}}
+    lines, regressed = compare_reports(baseline, {"routes": {}}, threshold_pct=10)
+    assert "only in baseline" in lines[1]
+    assert not regressed
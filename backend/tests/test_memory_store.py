@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+from app.db.memory_store import MemoryView
+
+NOW = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+def documents():
+    """Newest first, like the window Mongo hands the store."""
+    sources = ["LiveMint", "Economic Times", "LiveMint", "NDTV", "Economic Times", "LiveMint"]
+    return [
+        {
+            "_id": f"a{index}",
+            "title": f"Headline {index}",
+            "source": source,
+            "categories": ["stocks"] if index % 2 else ["banking", "policy"],
+            "published_at": NOW - timedelta(hours=index)
+        }
+        for index, source in enumerate(sources)
+    ]
+
+def ids(articles):
+    return [article["_id"] for article in articles]
+
+def test_complete_window_answers_every_query():
+    view = MemoryView(3, documents(), complete=True)
+    assert ids(view.query(limit=4)) == ["a0", "a1", "a2", "a3"]
+    assert ids(view.query(limit=10, skip=4)) == ["a4", "a5"]
+    assert ids(view.query(limit=3, ascending=True)) == ["a5", "a4", "a3"]
+    assert ids(view.query(limit=10, source="LiveMint")) == ["a0", "a2", "a5"]
+    assert view.query(limit=10, category="tech") == []
+
+def test_partial_window_defers_pages_that_run_past_its_end():
+    view = MemoryView(3, documents(), complete=False)
+    # Fully inside the window, including a page ending exactly on its last article
+    assert ids(view.query(limit=2)) == ["a0", "a1"]
+    assert ids(view.query(limit=2, skip=4)) == ["a4", "a5"]
+    # Older articles in Mongo could fill these pages
+    assert view.query(limit=3, skip=4) is None
+    assert view.query(limit=10, category="stocks") is None
+    assert view.query(limit=10, category="tech") is None
+
+def test_partial_window_sorts_ascending_only_within_a_bounded_range():
+    view = MemoryView(3, documents(), complete=False)
+    assert view.query(limit=2, ascending=True) is None
+    start = NOW - timedelta(hours=3)
+    assert ids(view.query(limit=10, ascending=True, start=start)) == ["a3", "a2", "a1", "a0"]
+    assert ids(view.query(limit=2, skip=1, ascending=True, start=start)) == ["a2", "a1"]
+
+def test_time_window_bounds_are_inclusive_and_timezone_aware():
+    view = MemoryView(3, documents(), complete=False)
+    ist = timezone(timedelta(hours=5, minutes=30))
+    start = (NOW - timedelta(hours=4)).astimezone(ist)
+    end = (NOW - timedelta(hours=1)).astimezone(ist)
+    assert ids(view.query(limit=10, start=start, end=end)) == ["a1", "a2", "a3", "a4"]
+    # a4 is the oldest banking article held, and Mongo could have others from the same instant
+    assert view.query(limit=10, category="banking", start=start, end=end) is None
+    assert ids(view.query(limit=10, category="banking", start=start + timedelta(minutes=1), end=end)) == ["a2"]
+
+def test_records_round_trip_to_documents():
+    original = documents()[0]
+    original["enriched_at"] = NOW
+    view = MemoryView(1, [original], complete=True)
+    assert view.query(limit=1) == [original]
+    assert view.stats()["articles"] == 1 and view.stats()["generation"] == 1
@@ -0,0 +1,28 @@
+import base64
+from datetime import datetime, timedelta, timezone
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from app.api.news import encode_cursor, decode_cursor
+
+def test_cursor_round_trip():
+    article = {"_id": ObjectId(), "published_at": datetime(2026, 3, 2, 9, 30, 15, 123456, tzinfo=timezone.utc)}
+    assert decode_cursor(encode_cursor(article)) == (article["published_at"], article["_id"])
+
+def test_cursor_keeps_the_instant_of_offset_timestamps():
+    ist = timezone(timedelta(hours=5, minutes=30))
+    article = {"_id": ObjectId(), "published_at": datetime(2026, 3, 2, 15, 0, tzinfo=ist)}
+    published_at, _ = decode_cursor(encode_cursor(article))
+    assert published_at == datetime(2026, 3, 2, 9, 30, tzinfo=timezone.utc)
+    assert published_at.utcoffset() == timedelta(0)
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"2026-03-02T09:30:00+00:00").decode(),
+    base64.urlsafe_b64encode(b"yesterday|65f0c0ffee0000000000beef").decode(),
+    base64.urlsafe_b64encode(b"2026-03-02T09:30:00+00:00|not-an-object-id").decode(),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
@@ -0,0 +1,92 @@
+from pymongo.errors import PyMongoError
+from app.scraper.news_feed_scraper import NewsFeedScraper
+from app.scraper.pipeline import Pipeline, FetchStage, StoreStage
+
+PAGE = """
+<html><body>
+<ul>
+  <li class="box">
+    <h2><a href="https://economictimes.example/sensex-rally">Sensex rallies as banks lead gains</a></h2>
+    <p>Banking stocks pushed the index higher in afternoon trade on Monday.</p>
+    <span class="date">2 hours ago</span>
+    <span class="feed">— Economic Times</span>
+  </li>
+  <li class="box">
+    <h2><a href="https://livemint.example/rbi-policy">RBI keeps policy rate unchanged</a></h2>
+    <p>The central bank held rates steady and kept its inflation outlook.</p>
+    <span class="date">30 minutes ago</span>
+    <span class="feed">— LiveMint</span>
+  </li>
+  <li class="box">
+    <h2><a href="https://livemint.example/rbi-policy-2">RBI keeps policy rate unchanged</a></h2>
+    <p>A repeated headline that the dedupe stage drops within this run.</p>
+    <span class="date">31 minutes ago</span>
+    <span class="feed">— LiveMint</span>
+  </li>
+</ul>
+</body></html>
+"""
+
+class Archive:
+    """Stands in for MongoDB.archive_news: keeps what it is given, or raises `error`."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.articles = []
+
+    def __call__(self, batch):
+        if self.error:
+            raise self.error
+        self.articles += batch
+        return batch
+
+def scraper_with(archive, page=PAGE):
+    scraper = NewsFeedScraper()
+    scraper.fetch_page = lambda: page
+    scraper.db = type("Database", (), {"archive_news": staticmethod(archive)})()
+    scraper.publish = lambda: None
+    return scraper
+
+def stages_for(scraper, archive):
+    fetch = FetchStage(scraper.fetch_page)
+    store = StoreStage(archive, batch_size=2)
+    return fetch, store, Pipeline([fetch] + scraper.parse_stages() + [store])
+
+def test_pipeline_run_parses_and_stores_a_canned_page():
+    archive = Archive()
+    scraper = scraper_with(archive)
+    fetch, store, pipeline = stages_for(scraper, archive)
+    report = {stage["stage"]: stage for stage in pipeline.run()}
+
+    assert [article["title"] for article in archive.articles] == [
+        "Sensex rallies as banks lead gains", "RBI keeps policy rate unchanged"
+    ]
+    sensex, rbi = archive.articles
+    assert sensex["url"] == "https://economictimes.example/sensex-rally"
+    assert sensex["source"] == "Economic Times"
+    assert {"stocks", "banking"} <= set(sensex["categories"])
+    assert "policy" in rbi["categories"]
+    assert rbi["published_at"] > sensex["published_at"]
+    assert sensex["timestamp_iso"] == sensex["published_at"].isoformat()
+    assert report["dedupe"]["items_in"] == 3 and report["dedupe"]["items_out"] == 2
+    assert store.archived == 2
+    assert all(stage["errors"] == 0 for stage in report.values())
+
+def test_failed_fetch_stops_the_run_and_fails_it():
+    archive = Archive()
+    scraper = scraper_with(archive, page=None)
+    fetch, store, pipeline = stages_for(scraper, archive)
+    pipeline.run()
+
+    assert fetch.metrics["errors"] == 1
+    assert store.metrics["items_in"] == 0
+    assert scraper.scrape_and_store() == {"status": "failed", "inserted": 0}
+
+def test_store_errors_fail_the_run():
+    for error in (PyMongoError("write failed"), RuntimeError("bad document")):
+        scraper = scraper_with(Archive(error))
+        assert scraper.scrape_and_store() == {"status": "failed", "inserted": 0}
+
+def test_unchanged_feed_is_not_a_failure():
+    scraper = scraper_with(lambda batch: [])
+    assert scraper.scrape_and_store() == {"status": "unchanged", "inserted": 0}
@@ -0,0 +1,127 @@
+import os
+import pytest
+from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+from app.config.settings import COLLECTION_NAME
+from app.db.query_plans import check_query_plans, plan_stages, query_shapes, suggest_index, QueryShape
+
+COLLECTIONS = [COLLECTION_NAME, "api_keys", "api_usage", "users"]
+
+def index_scan(stats=None):
+    """Canned explain output for a plan served by an index."""
+    return {
+        "queryPlanner": {"winningPlan": {"stage": "LIMIT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}},
+        "executionStats": stats or {"nReturned": 20, "totalDocsExamined": 20}
+    }
+
+class CannedDatabase:
+    """Answers explain commands with canned plans: `plans(find)` returns the explain output or raises."""
+
+    def __init__(self, plans, collections=COLLECTIONS):
+        self.plans = plans
+        self.collections = collections
+        self.commands = []
+
+    def list_collection_names(self):
+        return list(self.collections)
+
+    def command(self, name, find, verbosity=None):
+        self.commands.append((name, find, verbosity))
+        return self.plans(find)
+
+def results_by_shape(results):
+    return {result["shape"]: result for result in results}
+
+def test_plan_stages_reads_classic_and_slot_based_plans():
+    classic = {"stage": "SORT", "inputStage": {"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]}}
+    slot_based = {"queryPlan": {"stage": "LIMIT", "inputStage": {"stage": "IXSCAN"}}, "slotBasedPlan": {"slots": "..."}}
+    assert sorted(plan_stages(classic)) == ["COLLSCAN", "IXSCAN", "OR", "SORT"]
+    assert sorted(plan_stages(slot_based)) == ["IXSCAN", "LIMIT"]
+
+def test_suggest_index_follows_equality_sort_range():
+    shape = QueryShape(
+        "category from/to", COLLECTION_NAME,
+        {"categories": "sample", "published_at": {"$gte": 1, "$lte": 2}},
+        [("published_at", DESCENDING), ("_id", DESCENDING)]
+    )
+    assert suggest_index(shape) == [("categories", ASCENDING), ("published_at", DESCENDING), ("_id", DESCENDING)]
+    missing = QueryShape("unenriched", COLLECTION_NAME, {"enriched_at": {"$exists": False}}, [("published_at", DESCENDING)])
+    assert suggest_index(missing) == [("enriched_at", ASCENDING), ("published_at", DESCENDING)]
+
+def test_index_plans_pass_and_use_execution_stats():
+    db = CannedDatabase(lambda find: index_scan())
+    results = check_query_plans(db)
+    assert len(results) == len(query_shapes())
+    assert all(not result["problems"] for result in results)
+    assert {verbosity for _, _, verbosity in db.commands} == {"executionStats"}
+
+def test_collection_scan_and_blocking_sort_fail_with_suggested_index():
+    def plans(find):
+        if find["find"] == "users":
+            return {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}, "executionStats": {}}
+        if find["find"] == COLLECTION_NAME:
+            return {"queryPlanner": {"winningPlan": {"stage": "SORT", "inputStage": {"stage": "IXSCAN"}}}, "executionStats": {}}
+        return index_scan()
+
+    results = results_by_shape(check_query_plans(CannedDatabase(plans)))
+    login = results["POST /auth/user/login"]
+    assert login["problems"] == ["collection scan"]
+    assert login["suggested_index"] == [("email", ASCENDING)]
+    assert results["GET /news/category/..."]["problems"] == ["blocking sort"]
+    # Text search sorts its matches by design
+    search = results["GET /news/search"]
+    assert search["problems"] == [] and len(search["allowed"]) == 1
+
+def test_index_plan_that_examines_far_more_than_it_returns_fails():
+    wasteful = {"nReturned": 0, "totalDocsExamined": 5000}
+
+    def plans(find):
+        if "enriched_at" in find["filter"] or "$text" in find["filter"]:
+            return index_scan(wasteful)
+        return index_scan()
+
+    results = results_by_shape(check_query_plans(CannedDatabase(plans)))
+    assert results["enrichment pass"]["problems"] == ["examined 5000 documents to return 0"]
+    assert results["enrichment pass"]["suggested_index"][0] == ("enriched_at", ASCENDING)
+    assert results["GET /news/search"]["problems"] == []
+    assert any("examined 5000" in note for note in results["GET /news/search"]["allowed"])
+
+def test_small_collections_are_not_flagged_as_wasteful():
+    results = check_query_plans(CannedDatabase(lambda find: index_scan({"nReturned": 0, "totalDocsExamined": 20})))
+    assert all(not result["problems"] for result in results)
+
+def test_missing_collections_and_failed_explains_fail():
+    def plans(find):
+        raise OperationFailure("explain not allowed")
+
+    results = check_query_plans(CannedDatabase(plans, collections=[COLLECTION_NAME]))
+    for result in results:
+        if result["collection"] == COLLECTION_NAME:
+            assert result["problems"][0].startswith("explain failed")
+        else:
+            assert result["problems"] == ["collection does not exist, run the migrations first"]
+
+def mongod_uri():
+    uri = os.environ["MONGODB_URI"]
+    client = MongoClient(uri, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"no mongod reachable at {uri}")
+    finally:
+        client.close()
+    return uri
+
+def test_every_shape_uses_an_index_on_a_migrated_database(capsys):
+    import check_query_plans as cli
+
+    uri = mongod_uri()
+    # Must match the DB_NAME settings were loaded with in conftest
+    db_name = os.environ["DB_NAME"]
+    try:
+        status = cli.main(["--uri", uri, "--db-name", db_name, "--create-indexes"])
+        assert status == 0, capsys.readouterr().out
+    finally:
+        client = MongoClient(uri)
+        client.drop_database(db_name)
+        client.close()
@@ -0,0 +1,74 @@
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.db.snapshot import Snapshot, write_snapshot
+
+NOW = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+def article(index, source, categories):
+    return {
+        "_id": f"a{index}",
+        "title": f"Headline {index}",
+        "source": source,
+        "categories": categories,
+        "published_at": NOW - timedelta(hours=index)
+    }
+
+# Newest first, as the scraper publishes them
+ARTICLES = [
+    article(0, "LiveMint", ["policy", "banking"]),
+    article(1, "Economic Times", ["stocks"]),
+    article(2, "LiveMint", ["stocks", "market"]),
+    article(3, "NDTV", ["banking"]),
+    article(4, "Economic Times", ["stocks", "banking"]),
+]
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = str(tmp_path / "news.snapshot")
+    write_snapshot(ARTICLES, 42, NOW, path=path)
+    snapshot = Snapshot(path)
+    yield snapshot
+    snapshot.close()
+
+def ids(bodies):
+    return [json.loads(body)["_id"] for body in bodies]
+
+def test_round_trip_keeps_header_and_bodies(snapshot):
+    assert snapshot.generation == 42
+    assert snapshot.published_at == NOW
+    assert snapshot.count == len(ARTICLES)
+    first = json.loads(snapshot.query(limit=1)[0])
+    assert first["_id"] == "a0"
+    assert first["categories"] == ["policy", "banking"]
+    assert datetime.fromisoformat(first["published_at"]) == ARTICLES[0]["published_at"]
+
+def test_query_pages_newest_and_oldest_first(snapshot):
+    assert ids(snapshot.query(limit=10)) == ["a0", "a1", "a2", "a3", "a4"]
+    assert ids(snapshot.query(skip=1, limit=2)) == ["a1", "a2"]
+    assert ids(snapshot.query(limit=2, ascending=True)) == ["a4", "a3"]
+
+def test_query_filters_by_category_and_source(snapshot):
+    assert ids(snapshot.query(category="banking")) == ["a0", "a3", "a4"]
+    assert ids(snapshot.query(source="Economic Times", ascending=True)) == ["a4", "a1"]
+    assert snapshot.query(category="tech") == []
+
+def test_time_window_is_inclusive(snapshot):
+    start, end = ARTICLES[3]["published_at"], ARTICLES[1]["published_at"]
+    assert ids(snapshot.query(start=start, end=end)) == ["a1", "a2", "a3"]
+    assert ids(snapshot.query(category="stocks", start=start, end=end)) == ["a1", "a2"]
+    assert ids(snapshot.query(start=NOW + timedelta(hours=1))) == []
+
+def test_empty_snapshot(tmp_path):
+    path = str(tmp_path / "empty.snapshot")
+    write_snapshot([], 1, NOW, path=path)
+    snapshot = Snapshot(path)
+    assert snapshot.count == 0
+    assert snapshot.query() == []
+    snapshot.close()
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "not.snapshot"
+    path.write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        Snapshot(str(path))
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+from fastapi.testclient import TestClient
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded where they are first used, never by importing the app
+DEFERRED_MODULES = ("uvicorn", "apscheduler", "bs4", "lxml", "passlib", "jose", "app.scraper.news_feed_scraper")
+
+def test_importing_the_app_defers_heavy_modules():
+    check = f"import sys, app.main; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], cwd=BACKEND, env=os.environ, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+def test_liveness_answers_without_startup_work():
+    from app.main import app
+    # No lifespan here, so no migrations, scheduler or database
+    response = TestClient(app).get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
@@ -77,10 +77,18 @@ export default function Dashboard({ user }) {
   const [regenerateDialog, setRegenerateDialog] = useState(false);
   const [revokeDialog, setRevokeDialog] = useState(false);
   const [selectedKey, setSelectedKey] = useState(null);
+  // Keys are stored hashed, so the full key is only known right after it is created
+  // The full key is only kept for this browser session; the server stores just its hash
+  const [savedKey, setSavedKey] = useState(sessionStorage.getItem("apiKey") || "");
   const [snackbar, setSnackbar] = useState({ open: false, message: "" });
   const [upgradeDialog, setUpgradeDialog] = useState(false);
   const [selectedPlan, setSelectedPlan] = useState(null);
   
+  // Earlier versions kept the full key in localStorage; drop any copy left there
+  useEffect(() => {
+    localStorage.removeItem("apiKey");
+  }, []);
+
   // Fetch user data from the /user/me endpoint
   useEffect(() => {
     const fetchUserData = async () => {
@@ -198,6 +206,16 @@ export default function Dashboard({ user }) {
     setSelectedKey(null);
   };
 
+  const saveKey = (key) => {
+    sessionStorage.setItem("apiKey", key);
+    setSavedKey(key);
+  };
+
+  // Full key if this browser created it, otherwise just the prefix
+  const displayKey = (k) => (
+    savedKey && savedKey.startsWith(k.key_prefix) ? savedKey : `${k.key_prefix}…`
+  );
+
   const handleRegenerate = async () => {
     handleRegenerateDialogClose();
     setLoading(true);
@@ -217,10 +235,11 @@ export default function Dashboard({ user }) {
         return;
       }
       if (res.ok && data.key) {
+        saveKey(data.key);
         setSuccess("API key regenerated successfully.");
         setSnackbar({ 
           open: true, 
-          message: "API key regenerated successfully. Old keys are now inactive." 
+          message: "API key regenerated successfully. Old keys are now inactive. Copy the new key now, it is only shown in this browser." 
         });
         fetchKeys();
       } else {
@@ -239,13 +258,9 @@ export default function Dashboard({ user }) {
     setError("");
     setSuccess("");
     try {
-      const res = await fetch(`${API_BASE}/api/v1/auth/user/api-keys/revoke`, {
+      const res = await fetch(`${API_BASE}/api/v1/auth/user/api-keys/revoke?key=${encodeURIComponent(selectedKey)}`, {
         method: "POST",
-        headers: {
-          Authorization: `Bearer ${localStorage.getItem("token")}`,
-          "Content-Type": "application/json"
-        },
-        body: JSON.stringify({ key: selectedKey })
+        headers: { Authorization: `Bearer ${localStorage.getItem("token")}` }
       });
       let data;
       try {
@@ -290,10 +305,11 @@ export default function Dashboard({ user }) {
         return;
       }
       if (res.ok && data.key) {
+        saveKey(data.key);
         setSuccess("API key created successfully.");
         setSnackbar({ 
           open: true, 
-          message: "New API key created successfully!" 
+          message: "New API key created successfully! Copy it now, it is only shown in this browser." 
         });
         fetchKeys();
       } else {
@@ -319,6 +335,7 @@ export default function Dashboard({ user }) {
 
   const handleLogout = () => {
     localStorage.removeItem("token");
+    sessionStorage.removeItem("apiKey");
     window.location.href = "/login";
   };
 
@@ -523,7 +540,7 @@ export default function Dashboard({ user }) {
                     {keys.map((k, index) => {
                       const tierInfo = getTierInfo(k.tier);
                       return (
-                        <React.Fragment key={k.key}>
+                        <React.Fragment key={`${k.key_prefix}-${k.created_at}`}>
                           {index > 0 && <Divider />}
                           <ListItem
                             disablePadding
@@ -557,25 +574,27 @@ export default function Dashboard({ user }) {
                                     whiteSpace: 'nowrap'
                                   }}
                                 >
-                                  {k.key}
+                                  {displayKey(k)}
                                 </Typography>
                                 
-                                <Tooltip title="Copy to clipboard">
-                                  <IconButton 
-                                    size="small" 
-                                    onClick={() => handleCopyKey(k.key)}
-                                    sx={{ ml: 1 }}
-                                  >
-                                    <ContentCopyIcon fontSize="small" />
-                                  </IconButton>
-                                </Tooltip>
+                                {savedKey.startsWith(k.key_prefix) && (
+                                  <Tooltip title="Copy to clipboard">
+                                    <IconButton 
+                                      size="small" 
+                                      onClick={() => handleCopyKey(savedKey)}
+                                      sx={{ ml: 1 }}
+                                    >
+                                      <ContentCopyIcon fontSize="small" />
+                                    </IconButton>
+                                  </Tooltip>
+                                )}
                               </Box>
                               
                               <Tooltip title="Revoke this key">
                                 <IconButton 
                                   edge="end" 
                                   color="error" 
-                                  onClick={() => handleRevokeDialogOpen(k.key)}
+                                  onClick={() => handleRevokeDialogOpen(k.key_prefix)}
                                   disabled={!k.is_active}
                                 >
                                   <DeleteIcon />
@@ -731,12 +750,12 @@ export default function Dashboard({ user }) {
                     position: 'relative'
                   }}>
                     <pre style={{ margin: 0 }}>
-                      curl -H "X-API-Key: {keys[0]?.key}" \<br/>
+                      curl -H "X-API-Key: {savedKey || "<your_api_key>"}" \<br/>
                       &nbsp;&nbsp;"{API_BASE}/api/v1/news/latest?limit=10"
                     </pre>
                     <IconButton
                       size="small"
-                      onClick={() => handleCopyKey(`curl -H "X-API-Key: ${keys[0]?.key}" "${API_BASE}/api/v1/news/latest?limit=10"`)}
+                      onClick={() => handleCopyKey(`curl -H "X-API-Key: ${savedKey || "<your_api_key>"}" "${API_BASE}/api/v1/news/latest?limit=10"`)}
                       sx={{ 
                         position: 'absolute', 
                         top: 8, 
@@ -111,7 +111,9 @@ getLatestNews();`;
       endpoint: "/api/v1/news/latest",
       description: "Returns the most recent financial news articles.",
       params: [
-        { name: "limit", type: "integer", description: "Maximum number of results to return (default: 10, max: based on your tier)" }
+        { name: "limit", type: "integer", description: "Maximum number of results to return (default: 10, max: based on your tier)" },
+        { name: "fields", type: "string", description: "Comma-separated fields to return, e.g. 'title,url,published_at' (default: all)" },
+        { name: "view", type: "string", description: "'summary' returns title, source, timestamp, URL and truncated content (default: 'full')" }
       ]
     },
     {
@@ -122,8 +124,12 @@ getLatestNews();`;
       params: [
         { name: "limit", type: "integer", description: "Maximum number of results to return (default: 20)" },
         { name: "skip", type: "integer", description: "Number of results to skip for pagination (default: 0)" },
-        { name: "sort_by", type: "string", description: "Field to sort by (default: 'timestamp_iso')" },
-        { name: "sort_order", type: "integer", description: "Sort order: -1 for descending, 1 for ascending (default: -1)" }
+        { name: "sort_by", type: "string", description: "Field to sort by: 'published_at' or its alias 'timestamp_iso' (default: 'published_at'). Other fields return 400." },
+        { name: "sort_order", type: "integer", description: "Sort order: -1 for descending, 1 for ascending (default: -1)" },
+        { name: "from", type: "datetime", description: "Only return articles published at or after this ISO 8601 time" },
+        { name: "to", type: "datetime", description: "Only return articles published at or before this ISO 8601 time" },
+        { name: "fields", type: "string", description: "Comma-separated fields to return, e.g. 'title,url,published_at' (default: all)" },
+        { name: "view", type: "string", description: "'summary' returns title, source, timestamp, URL and truncated content (default: 'full')" }
       ]
     },
     {
@@ -134,7 +140,11 @@ getLatestNews();`;
       params: [
         { name: "category", type: "string", description: "Category to filter by (e.g., stocks, market, economy, banking, tech, policy)" },
         { name: "limit", type: "integer", description: "Maximum number of results to return (default: 20)" },
-        { name: "skip", type: "integer", description: "Number of results to skip for pagination (default: 0)" }
+        { name: "skip", type: "integer", description: "Number of results to skip for pagination (default: 0)" },
+        { name: "from", type: "datetime", description: "Only return articles published at or after this ISO 8601 time" },
+        { name: "to", type: "datetime", description: "Only return articles published at or before this ISO 8601 time" },
+        { name: "fields", type: "string", description: "Comma-separated fields to return, e.g. 'title,url,published_at' (default: all)" },
+        { name: "view", type: "string", description: "'summary' returns title, source, timestamp, URL and truncated content (default: 'full')" }
       ]
     },
     {
@@ -145,7 +155,11 @@ getLatestNews();`;
       params: [
         { name: "source", type: "string", description: "Source name to filter by (e.g., 'Economic Times', 'Bloomberg Quint')" },
         { name: "limit", type: "integer", description: "Maximum number of results to return (default: 20)" },
-        { name: "skip", type: "integer", description: "Number of results to skip for pagination (default: 0)" }
+        { name: "skip", type: "integer", description: "Number of results to skip for pagination (default: 0)" },
+        { name: "from", type: "datetime", description: "Only return articles published at or after this ISO 8601 time" },
+        { name: "to", type: "datetime", description: "Only return articles published at or before this ISO 8601 time" },
+        { name: "fields", type: "string", description: "Comma-separated fields to return, e.g. 'title,url,published_at' (default: all)" },
+        { name: "view", type: "string", description: "'summary' returns title, source, timestamp, URL and truncated content (default: 'full')" }
       ]
     },
     {
@@ -156,7 +170,22 @@ getLatestNews();`;
       params: [
         { name: "query", type: "string", description: "Search query", required: true },
         { name: "limit", type: "integer", description: "Maximum number of results to return (default: 20)" },
-        { name: "skip", type: "integer", description: "Number of results to skip for pagination (default: 0)" }
+        { name: "skip", type: "integer", description: "Number of results to skip for pagination (default: 0)" },
+        { name: "from", type: "datetime", description: "Only return articles published at or after this ISO 8601 time" },
+        { name: "to", type: "datetime", description: "Only return articles published at or before this ISO 8601 time" },
+        { name: "fields", type: "string", description: "Comma-separated fields to return, e.g. 'title,url,published_at' (default: all)" },
+        { name: "view", type: "string", description: "'summary' returns title, source, timestamp, URL and truncated content (default: 'full')" }
+      ]
+    },
+    {
+      name: "Batch Queries",
+      method: "POST",
+      endpoint: "/api/v1/news/batch",
+      description: "Runs several latest, category, source and search queries in one request. Each page returns a next_cursor for the following page.",
+      params: [
+        { name: "queries", type: "array", description: "JSON body list of { type, value, limit, cursor } sub-queries (max per batch depends on your tier)", required: true },
+        { name: "fields", type: "string", description: "Optional comma-separated fields to return for every sub-query" },
+        { name: "view", type: "string", description: "Optional 'summary' view for every sub-query" }
       ]
     }
   ];
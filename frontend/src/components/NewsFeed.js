@@ -60,12 +60,12 @@ export default function NewsFeed() {
           return;
         }
         if (res.ok && data.keys && data.keys.length > 0) {
-          for (const key of data.keys) {
-            if (key.is_active) {
-              setApiKey(key.key);
-              setIsAuthenticated(true);
-              break;
-            }
+          // Only key prefixes come back from the server; the full key is kept by the dashboard for this session
+          const savedKey = sessionStorage.getItem("apiKey") || "";
+          const match = data.keys.find(key => key.is_active && savedKey.startsWith(key.key_prefix));
+          if (match) {
+            setApiKey(savedKey);
+            setIsAuthenticated(true);
           }
         }
       } catch (err) {